@@ -6,10 +6,20 @@ Base Watcher - Abstract class for all watcher scripts.
 All watchers inherit from this class and implement:
 - check_for_updates(): Return list of new items to process
 - create_action_file(item): Create .md file in Needs_Action folder
+
+Watchers that buffer state (e.g. processed-ID caches) can override
+flush(), which runs once after each check cycle and on shutdown.
+
+Send SIGUSR1 (POSIX) or call wake() to run the next check immediately.
 """
 
-import time
+import sys
+import socket
+import select
+import signal
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -24,6 +34,10 @@ logging.basicConfig(
 class BaseWatcher(ABC):
     """Abstract base class for all watcher scripts."""
     
+    # Worker threads used for create_action_file. Subclasses whose
+    # create_action_file is thread-safe and I/O bound can raise this.
+    max_workers = 1
+    
     def __init__(self, vault_path: str, check_interval: int = 60):
         """
         Initialize the watcher.
@@ -36,6 +50,11 @@ class BaseWatcher(ABC):
         self.needs_action = self.vault_path / 'Needs_Action'
         self.check_interval = check_interval
         self.logger = logging.getLogger(self.__class__.__name__)
+        # Self-pipe that cuts the idle wait short. Writing to it takes no
+        # lock (unlike Event.set()), so wake() is safe in a signal handler.
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
         
         # Ensure Needs_Action folder exists
         self.needs_action.mkdir(parents=True, exist_ok=True)
@@ -63,25 +82,79 @@ class BaseWatcher(ABC):
         """
         pass
     
+    def _create_action_files(self, items: list):
+        """Create action files for items, concurrently if max_workers > 1."""
+        if self.max_workers <= 1 or len(items) <= 1:
+            for item in items:
+                try:
+                    filepath = self.create_action_file(item)
+                    self.logger.info(f'Created action file: {filepath.name}')
+                except Exception as e:
+                    self.logger.error(f'Error creating action file: {e}')
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            futures = [executor.submit(self.create_action_file, item) for item in items]
+            for future in as_completed(futures):
+                try:
+                    filepath = future.result()
+                    self.logger.info(f'Created action file: {filepath.name}')
+                except Exception as e:
+                    self.logger.error(f'Error creating action file: {e}')
+    
+    def flush(self):
+        """
+        Persist state buffered during a check cycle.
+        
+        Called once after each cycle and on shutdown. Default is a no-op.
+        """
+        pass
+    
+    def wake(self):
+        """Wake the main loop so the next check runs immediately."""
+        try:
+            self._wake_w.send(b'\0')
+        except OSError:
+            pass  # Buffer full: a wake-up is already pending
+    
+    def _idle(self, timeout: float):
+        """Sleep until timeout or wake(), then clear pending wake-ups."""
+        select.select([self._wake_r], [], [], timeout)
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except OSError:
+            pass  # Nothing left to read
+    
+    def _handle_sigterm(self, signum, frame):
+        """Exit cleanly on SIGTERM so pending state gets flushed."""
+        self.logger.info('Received SIGTERM, shutting down')
+        sys.exit(0)
+    
     def run(self):
         """Main loop - continuously check for updates and create action files."""
         self.logger.info(f'Starting {self.__class__.__name__}')
         self.logger.info(f'Vault path: {self.vault_path}')
         self.logger.info(f'Check interval: {self.check_interval}s')
         
-        while True:
-            try:
-                items = self.check_for_updates()
-                for item in items:
-                    try:
-                        filepath = self.create_action_file(item)
-                        self.logger.info(f'Created action file: {filepath.name}')
-                    except Exception as e:
-                        self.logger.error(f'Error creating action file: {e}')
-            except Exception as e:
-                self.logger.error(f'Error in check loop: {e}')
-            
-            time.sleep(self.check_interval)
+        # Signal handlers can only be installed from the main thread
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self._handle_sigterm)
+            if hasattr(signal, 'SIGUSR1'):  # Not available on Windows
+                signal.signal(signal.SIGUSR1, lambda *_: self.wake())
+        
+        try:
+            while True:
+                try:
+                    items = self.check_for_updates()
+                    self._create_action_files(items)
+                    self.flush()
+                except Exception as e:
+                    self.logger.error(f'Error in check loop: {e}')
+                
+                self._idle(self.check_interval)
+        finally:
+            self.flush()
 
 
 if __name__ == '__main__':
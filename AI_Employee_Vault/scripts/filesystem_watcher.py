@@ -128,7 +128,7 @@ priority: normal
 ---
 *Generated by File System Watcher v0.1*
 '''
-        meta_path.write_text(content)
+        meta_path.write_bytes(content.encode('utf-8'))
     
     def _format_size(self, size: int) -> str:
         """Format file size in human-readable format."""
@@ -10,18 +10,25 @@ Usage:
     python gmail_watcher.py /path/to/vault                 # Run watcher
 """
 
+import os
 import sys
 import time
 import logging
-import base64
+import binascii
+import random
+import re
 import pickle
+import sqlite3
+import threading
 import argparse
+import asyncio
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List
 
 try:
     from google.oauth2.credentials import Credentials
+    from google.auth.transport.requests import Request
     from google_auth_oauthlib.flow import InstalledAppFlow
     from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
@@ -30,6 +37,18 @@ except ImportError:
     print("  pip install google-auth google-auth-oauthlib google-auth-httplib2 google-api-python-client")
     sys.exit(1)
 
+# Optional: Bloom filter for processed-ID membership (pip install pybloom-live)
+try:
+    from pybloom_live import ScalableBloomFilter
+except ImportError:
+    ScalableBloomFilter = None
+
+# Optional: async message fetching (pip install aiohttp)
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 # Import base watcher from same directory
 sys.path.insert(0, str(Path(__file__).parent))
 from base_watcher import BaseWatcher
@@ -43,50 +62,234 @@ logging.basicConfig(
 # Gmail API scopes
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
+# Watcher state database (processed message IDs + sync state), kept in the
+# vault. Processed IDs older than the retention window are pruned at startup.
+DB_NAME = '.watcher.db'
+PROCESSED_RETENTION_DAYS = 90
+SQL_MAX_PARAMS = 500  # IDs per IN (...) query
+
+# Bloom filter sizing when pybloom-live is installed. It only pre-screens
+# membership: misses are definitely new, hits are confirmed in the database.
+BLOOM_CAPACITY = 10000
+BLOOM_ERROR_RATE = 0.001
+
+# Labels whose messages are ignored, as messages().list() does by default
+SKIP_LABELS = frozenset(('SPAM', 'TRASH'))
+
+# Max messages().get() calls per batch round trip (API limit is 100,
+# but large batches tend to trip 429 rate limiting)
+BATCH_SIZE = 50
+
+# Partial-response mask for messages().get() - only what the action file uses.
+# Nested parts are listed explicitly (3 levels covers mixed > related >
+# alternative > text/plain).
+_PART_FIELDS = 'mimeType,filename,body(size,data,attachmentId)'
+MESSAGE_FIELDS = (
+    'id,internalDate,payload(mimeType,headers(name,value),body(size,data),'
+    f'parts({_PART_FIELDS},parts({_PART_FIELDS},parts({_PART_FIELDS}))))'
+)
+
+# Keywords that bump email priority (matched case-insensitively at word start)
+HIGH_PRIORITY_KEYWORDS = ['urgent', 'asap', 'immediately', 'emergency']
+MEDIUM_PRIORITY_KEYWORDS = ['invoice', 'payment', 'deadline', 'review']
+
+# Gmail bodies are URL-safe base64; map to the standard alphabet for a2b_base64
+_URLSAFE_TO_STD = str.maketrans('-_', '+/')
+
+# Header-only fetch used to triage emails before pulling full bodies
+METADATA_HEADERS = ['From', 'To', 'Subject', 'Date']
+METADATA_FIELDS = 'id,internalDate,payload(headers(name,value))'
+
+# REST endpoint and connection cap for the aiohttp fetch path
+GMAIL_MESSAGES_URL = 'https://gmail.googleapis.com/gmail/v1/users/me/messages/'
+ASYNC_CONNECTIONS = 10
+
+# Retry settings for rate limiting / transient server errors
+NUM_RETRIES = 5
+RETRYABLE_STATUSES = {429, 500, 503}
+MAX_BACKOFF = 64  # seconds
+
+# Markdown written to Needs_Action for each email (filled via str.format_map)
+ACTION_FILE_TEMPLATE = '''---
+type: email
+from: {from_}
+to: {to}
+subject: {subject}
+received: {received}
+priority: {priority}
+status: pending
+message_id: {message_id}
+---
+
+# Email Content
+
+**From:** {from_}  
+**To:** {to}  
+**Subject:** {subject}  
+**Date:** {date}
+
+---
+
+{body}
+
+---
+
+# Attachments
+{attachments}
+
+# Suggested Actions
+- [ ] Review email content
+- [ ] Reply to sender
+- [ ] Take required action
+- [ ] Archive after processing
+
+---
+*Generated by Gmail Watcher v0.1 (Silver Tier)*
+'''
+
 
 class GmailWatcher(BaseWatcher):
     """Monitor Gmail for new important/unread emails."""
     
+    # Gmail tolerates ~10 concurrent requests per user
+    max_workers = 10
+    
     def __init__(self, vault_path: str, credentials_path: str, token_path: str, 
                  check_interval: int = 120, keywords: List[str] = None,
-                 require_keywords: bool = False):
+                 require_keywords: bool = False, async_fetch: bool = False):
         super().__init__(vault_path, check_interval)
         
         self.credentials_path = Path(credentials_path)
         self.token_path = Path(token_path)
         self.keywords = keywords or ['urgent', 'invoice', 'payment', 'asap']
         self.require_keywords = require_keywords  # If False, get ALL unread emails
+        self.async_fetch = async_fetch and aiohttp is not None
+        if async_fetch and aiohttp is None:
+            self.logger.warning("aiohttp not installed - using batch requests instead")
+        
+        # Build query once
+        # If require_keywords is False, just get all unread emails
+        # If require_keywords is True, filter by keywords
+        if self.require_keywords and self.keywords:
+            self._query = 'is:unread (' + ' OR '.join(f'"{kw}"' for kw in self.keywords) + ')'
+        else:
+            self._query = 'is:unread'
+        
         self.service: Optional[build] = None
-        self.processed_ids = set()
+        self._creds: Optional[Credentials] = None
+        self._service_creds: Optional[Credentials] = None  # creds self.service was built with
+        self.db_path = self.vault_path / DB_NAME
+        self._db = self._open_db()
+        self._migrate_legacy_cache()
+        self._seen_bloom = None  # optional ScalableBloomFilter pre-screen
+        self._unflushed_ids = []  # processed IDs not yet written to the database
+        self._message_cache = {}  # message id -> full payload from batch fetch
+        self._metadata_cache = {}  # message id -> headers-only payload (triage)
+        self._ids_lock = threading.Lock()  # guards _seen_bloom/_unflushed_ids
+        self._local = threading.local()  # per-thread API service for workers
+        self._backoff_level = 0  # raised on 429/5xx, lowered on each success
+        self._needs_action_dirty = False  # action files written since last dir sync
+        
+        # Incremental sync state (users.history), persisted on flush()
+        self.last_history_id: Optional[str] = self._get_state('gmail_history_id')
+        self._last_seen_ts = int(self._get_state('gmail_last_seen_ts') or 0)  # epoch seconds
+        self._sync_state_dirty = False
+        # New message IDs without an action file yet. The cursors above may
+        # already be past them, so they are re-checked on every cycle until
+        # create_action_file succeeds.
+        self._retry_ids = set((self._get_state('gmail_retry_ids') or '').split())
+        
+        # Event loop and keep-alive HTTP session reused across cycles (async_fetch)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http = None
         
-        # Load previously processed IDs from cache
+        # One alternation per priority tier, scanned once per email
+        self._high_re = re.compile(r'\b(?:' + '|'.join(HIGH_PRIORITY_KEYWORDS) + ')', re.I)
+        self._med_re = re.compile(r'\b(?:' + '|'.join(MEDIUM_PRIORITY_KEYWORDS) + ')', re.I)
+        
+        # Prune old processed IDs and warm the Bloom filter
         self._load_processed_ids()
     
-    def _load_processed_ids(self):
-        """Load processed email IDs from cache file."""
+    def _open_db(self) -> sqlite3.Connection:
+        """Open the watcher state database, creating tables if needed."""
+        db = sqlite3.connect(str(self.db_path), isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute('CREATE TABLE IF NOT EXISTS processed (id TEXT PRIMARY KEY, ts INTEGER NOT NULL)')
+        db.execute('CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        return db
+    
+    def _migrate_legacy_cache(self):
+        """Import processed IDs from the old pickled .gmail_cache.pkl set."""
         cache_file = self.vault_path / '.gmail_cache.pkl'
-        self.logger.info(f"Cache file location: {cache_file}")
-        self.logger.info(f"Cache file exists: {cache_file.exists()}")
-        
-        if cache_file.exists():
-            try:
-                self.processed_ids = pickle.loads(cache_file.read_bytes())
-                self.logger.info(f"Loaded {len(self.processed_ids)} processed email IDs from cache")
-            except Exception as e:
-                self.logger.warning(f"Could not load cache: {e}")
-        else:
-            self.logger.info("No cache file found - will process all emails")
+        if not cache_file.exists():
+            return
+        try:
+            ids = [str(msg_id) for msg_id in pickle.loads(cache_file.read_bytes())]
+            now = int(time.time())
+            self._db.execute('BEGIN')
+            self._db.executemany('INSERT OR IGNORE INTO processed (id, ts) VALUES (?, ?)',
+                                 ((msg_id, now) for msg_id in ids))
+            self._db.execute('COMMIT')
+            cache_file.unlink()
+            self.logger.info(f"Migrated {len(ids)} IDs from {cache_file.name}")
+        except Exception as e:
+            if self._db.in_transaction:
+                self._db.execute('ROLLBACK')
+            self.logger.warning(f"Could not migrate legacy cache: {e}")
+    
+    def _load_processed_ids(self):
+        """Prune expired processed IDs and load the rest into the Bloom filter."""
+        self.logger.info(f"State database: {self.db_path}")
+        
+        cutoff = int(time.time()) - PROCESSED_RETENTION_DAYS * 86400
+        self._db.execute('DELETE FROM processed WHERE ts < ?', (cutoff,))
+        
+        if ScalableBloomFilter is not None:
+            self._seen_bloom = ScalableBloomFilter(initial_capacity=BLOOM_CAPACITY,
+                                                   error_rate=BLOOM_ERROR_RATE)
+            for (msg_id,) in self._db.execute('SELECT id FROM processed'):
+                self._seen_bloom.add(msg_id)
+        
+        count = self._db.execute('SELECT COUNT(*) FROM processed').fetchone()[0]
+        self.logger.info(f"Loaded {count} processed email IDs")
+    
+    def _filter_new(self, messages: list) -> list:
+        """Return only messages that have not been processed yet."""
+        with self._ids_lock:
+            skip = set(self._unflushed_ids)
+            candidates = [m['id'] for m in messages if m['id'] not in skip]
+            if self._seen_bloom is not None:
+                # Bloom misses are definitely new; only hits need a lookup
+                candidates = [msg_id for msg_id in candidates if msg_id in self._seen_bloom]
+        
+        # One IN (...) query per chunk instead of a lookup per message
+        for start in range(0, len(candidates), SQL_MAX_PARAMS):
+            chunk = candidates[start:start + SQL_MAX_PARAMS]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._db.execute(f'SELECT id FROM processed WHERE id IN ({placeholders})', chunk)
+            skip.update(row[0] for row in rows)
+        
+        return [m for m in messages if m['id'] not in skip]
     
     def _save_processed_ids(self):
-        """Save processed email IDs to cache file."""
-        cache_file = self.vault_path / '.gmail_cache.pkl'
+        """Insert IDs processed this cycle into the database in one transaction."""
+        with self._ids_lock:
+            new_ids, self._unflushed_ids = self._unflushed_ids, []
+        if not new_ids:
+            return
+        now = int(time.time())
         try:
-            # Keep only last 1000 IDs
-            if len(self.processed_ids) > 1000:
-                self.processed_ids = set(list(self.processed_ids)[-1000:])
-            cache_file.write_bytes(pickle.dumps(self.processed_ids))
+            self._db.execute('BEGIN')
+            self._db.executemany('INSERT OR IGNORE INTO processed (id, ts) VALUES (?, ?)',
+                                 ((msg_id, now) for msg_id in new_ids))
+            self._db.execute('COMMIT')
         except Exception as e:
-            self.logger.warning(f"Could not save cache: {e}")
+            if self._db.in_transaction:
+                self._db.execute('ROLLBACK')
+            self.logger.warning(f"Could not save processed IDs: {e}")
+            with self._ids_lock:
+                self._unflushed_ids[:0] = new_ids
     
     def authenticate(self) -> bool:
         """Run OAuth authentication flow."""
@@ -104,7 +307,7 @@ class GmailWatcher(BaseWatcher):
             # Save token
             self.token_path.parent.mkdir(parents=True, exist_ok=True)
             with open(self.token_path, 'wb') as f:
-                pickle.dump(creds, f)
+                pickle.dump(creds, f, protocol=pickle.HIGHEST_PROTOCOL)
             
             self.logger.info("Authentication successful!")
             self.logger.info(f"Token saved to: {self.token_path}")
@@ -114,25 +317,47 @@ class GmailWatcher(BaseWatcher):
             self.logger.error(f"Authentication failed: {e}")
             return False
     
-    def get_service(self) -> Optional[build]:
-        """Get authenticated Gmail API service."""
-        if not self.token_path.exists():
-            self.logger.error("Token not found. Run with --authenticate first.")
-            return None
+    def _load_credentials(self) -> Optional[Credentials]:
+        """Get OAuth credentials, refreshing in place when expired."""
+        creds = self._creds
         
-        try:
+        # Only hit the token file when nothing usable is cached
+        if creds is None or (not creds.valid and not creds.refresh_token):
+            if not self.token_path.exists():
+                self.logger.error("Token not found. Run with --authenticate first.")
+                return None
             creds = pickle.loads(self.token_path.read_bytes())
+        
+        if not creds.valid:
+            if creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+                with open(self.token_path, 'wb') as f:
+                    pickle.dump(creds, f, protocol=pickle.HIGHEST_PROTOCOL)
+            else:
+                self.logger.error("Credentials invalid. Re-authenticate.")
+                return None
+        
+        self._creds = creds
+        return creds
+    
+    def _build_service(self, creds: Credentials):
+        """Build a Gmail API service object."""
+        # Use the discovery document bundled with google-api-python-client
+        # instead of fetching it over HTTPS on every build
+        return build('gmail', 'v1', credentials=creds,
+                     static_discovery=True, cache_discovery=False)
+    
+    def get_service(self) -> Optional[build]:
+        """Get authenticated Gmail API service (rebuilt only when credentials rotate)."""
+        try:
+            creds = self._load_credentials()
+            if creds is None:
+                return None
             
-            if not creds.valid:
-                if creds.expired and creds.refresh_token:
-                    creds.refresh(None)
-                    with open(self.token_path, 'w') as f:
-                        pickle.dump(creds, f)
-                else:
-                    self.logger.error("Credentials invalid. Re-authenticate.")
-                    return None
-            
-            return build('gmail', 'v1', credentials=creds)
+            if self.service is None or creds is not self._service_creds:
+                self.service = self._build_service(creds)
+                self._service_creds = creds
+            return self.service
             
         except Exception as e:
             self.logger.error(f"Error getting service: {e}")
@@ -147,52 +372,306 @@ class GmailWatcher(BaseWatcher):
             return []
         
         try:
-            # Build query
-            # If require_keywords is False, just get all unread emails
-            # If require_keywords is True, filter by keywords
-            if self.require_keywords and self.keywords:
-                keyword_query = ' OR '.join([f'"{kw}"' for kw in self.keywords])
-                query = f'is:unread ({keyword_query})'
-            else:
-                query = 'is:unread'
+            messages = None
             
-            self.logger.info(f"Gmail query: {query}")
+            # The history API has no search query, so keyword filtering
+            # always goes through messages().list()
+            use_history = not (self.require_keywords and self.keywords)
+            if use_history and self.last_history_id:
+                messages = self._list_history()
             
-            # Fetch messages
-            results = self.service.users().messages().list(
-                userId='me',
-                q=query,
-                maxResults=10
-            ).execute()
+            if messages is None:
+                # Read the seed before listing so nothing arriving in between
+                # is missed, but only adopt it once the listing succeeded
+                seed = self._current_history_id() if use_history else None
+                messages = self._list_unread()
+                if seed is not None:
+                    self._set_history_id(seed)
+            
+            # Retry emails whose action file failed on an earlier cycle
+            listed = {m['id'] for m in messages}
+            with self._ids_lock:
+                messages += [{'id': msg_id} for msg_id in self._retry_ids if msg_id not in listed]
             
-            messages = results.get('messages', [])
             self.logger.info(f"Total messages from API: {len(messages)}")
             
             # Log message IDs
             for msg in messages:
                 self.logger.info(f"  Message ID: {msg['id']}")
             
-            new_messages = [m for m in messages if m['id'] not in self.processed_ids]
+            new_messages = self._filter_new(messages)
             self.logger.info(f"New messages (not in cache): {len(new_messages)}")
             
             self.logger.info(f"Found {len(new_messages)} new emails")
-            return new_messages
+            
+            # Track until their action files exist, so a failure below
+            # doesn't lose them once the cursors have moved on (retried IDs
+            # that are processed by now drop out here)
+            new_ids = {m['id'] for m in new_messages}
+            with self._ids_lock:
+                if new_ids != self._retry_ids:
+                    self._retry_ids = new_ids
+                    self._sync_state_dirty = True
+            
+            # Fetch all new messages in batched round trips
+            return self._prefetch(new_messages)
             
         except HttpError as e:
             self.logger.error(f"Gmail API error: {e}")
             if e.resp.status == 401:
+                # Force a reload from the token file on next check
                 self.service = None
+                self._creds = None
+            elif e.resp.status in RETRYABLE_STATUSES:
+                self._backoff()
             return []
         except Exception as e:
             self.logger.error(f"Error checking emails: {e}")
             return []
     
+    def _list_unread(self) -> list:
+        """List unread messages matching the search query."""
+        # Let the server skip mail older than the newest one already processed
+        # (1s overlap; duplicates are dropped by _filter_new)
+        query = self._query
+        if self._last_seen_ts:
+            query = f'{query} after:{self._last_seen_ts - 1}'
+        self.logger.info(f"Gmail query: {query}")
+        
+        results = self.service.users().messages().list(
+            userId='me',
+            q=query,
+            maxResults=10
+        ).execute(num_retries=NUM_RETRIES)
+        self._recover()
+        return results.get('messages', [])
+    
+    def _list_history(self) -> Optional[list]:
+        """
+        List unread messages added since last_history_id.
+        
+        Returns:
+            List of messages, or None if the history ID has expired
+        """
+        messages = []
+        seen = set()
+        history_id = self.last_history_id
+        page_token = None
+        
+        try:
+            while True:
+                results = self.service.users().history().list(
+                    userId='me',
+                    startHistoryId=self.last_history_id,
+                    historyTypes=['messageAdded'],
+                    labelId='UNREAD',
+                    pageToken=page_token
+                ).execute(num_retries=NUM_RETRIES)
+                
+                for record in results.get('history', []):
+                    for added in record.get('messagesAdded', []):
+                        msg = added['message']
+                        # labelId='UNREAD' covers every label; match
+                        # messages().list(), which leaves out spam and trash
+                        if SKIP_LABELS.intersection(msg.get('labelIds', ())):
+                            continue
+                        if msg['id'] not in seen:
+                            seen.add(msg['id'])
+                            messages.append(msg)
+                
+                history_id = results.get('historyId', history_id)
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
+        except HttpError as e:
+            if e.resp.status == 404:
+                self.logger.warning("History ID expired - falling back to unread listing")
+                return None
+            raise
+        
+        self._recover()
+        self._set_history_id(history_id)
+        return messages
+    
+    def _current_history_id(self) -> str:
+        """Get the mailbox's current history ID (to start incremental sync from)."""
+        profile = self.service.users().getProfile(userId='me').execute(num_retries=NUM_RETRIES)
+        return profile['historyId']
+    
+    def _get_state(self, key: str) -> Optional[str]:
+        """Read a value from the state table."""
+        row = self._db.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_history_id(self, history_id):
+        """Update the history ID; it is persisted on the next flush()."""
+        history_id = str(history_id)
+        if history_id != self.last_history_id:
+            self.last_history_id = history_id
+            self._sync_state_dirty = True
+    
+    def _save_sync_state(self):
+        """Persist the history ID, newest processed timestamp and retry IDs if they changed."""
+        if not self._sync_state_dirty:
+            return
+        with self._ids_lock:
+            retry_ids = ' '.join(sorted(self._retry_ids))
+        state = [('gmail_last_seen_ts', str(self._last_seen_ts)),
+                 ('gmail_retry_ids', retry_ids)]
+        if self.last_history_id:
+            state.append(('gmail_history_id', self.last_history_id))
+        try:
+            self._db.executemany('INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)', state)
+            self._sync_state_dirty = False
+        except Exception as e:
+            self.logger.warning(f"Could not save sync state: {e}")
+    
+    def _prefetch(self, messages: list) -> list:
+        """
+        Two-tier fetch: headers for all new emails, then full bodies.
+        
+        Emails whose subject alone is high priority are fetched in full
+        and written first; the rest are fetched afterwards.
+        
+        Returns:
+            Messages that still need an action file
+        """
+        if not messages:
+            return []
+        
+        self._fetch_messages(messages, metadata_only=True)
+        hot, rest = [], []
+        for m in messages:
+            meta = self._metadata_cache.get(m['id'])
+            headers = meta['payload'].get('headers', []) if meta else []
+            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
+            (hot if self._high_re.search(subject) else rest).append(m)
+        self._metadata_cache.clear()
+        
+        if hot:
+            self._fetch_messages(hot)
+            for m in hot:
+                try:
+                    filepath = self.create_action_file(m)
+                    self.logger.info(f"Created high-priority action file: {filepath.name}")
+                except Exception:
+                    pass  # logged by create_action_file; retried next cycle
+        
+        self._fetch_messages(rest)
+        return rest
+    
+    def _fetch_messages(self, messages: list, metadata_only: bool = False):
+        """Fetch message payloads into the message cache (batch HTTP or aiohttp)."""
+        if self.async_fetch and not metadata_only:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._fetch_messages_async(messages))
+            return
+        
+        if metadata_only:
+            params = {'format': 'metadata', 'metadataHeaders': METADATA_HEADERS,
+                      'fields': METADATA_FIELDS}
+        else:
+            params = {'format': 'full', 'fields': MESSAGE_FIELDS}
+        
+        callback = self._on_metadata_fetched if metadata_only else self._on_message_fetched
+        for start in range(0, len(messages), BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for m in messages[start:start + BATCH_SIZE]:
+                batch.add(
+                    self.service.users().messages().get(userId='me', id=m['id'], **params),
+                    request_id=m['id']
+                )
+            for attempt in range(NUM_RETRIES + 1):
+                try:
+                    batch.execute()
+                    self._recover()
+                    break
+                except HttpError as e:
+                    if e.resp.status not in RETRYABLE_STATUSES or attempt == NUM_RETRIES:
+                        raise
+                    self._backoff()
+    
+    async def _fetch_messages_async(self, messages: list):
+        """Fetch full message payloads concurrently over a keep-alive aiohttp session."""
+        creds = self._load_credentials()  # refreshes the access token if expired
+        if creds is None or not messages:
+            return
+        
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=ASYNC_CONNECTIONS)
+            )
+        headers = {'Authorization': f'Bearer {creds.token}'}
+        params = {'format': 'full', 'fields': MESSAGE_FIELDS}
+        
+        async def fetch(msg_id):
+            async with self._http.get(GMAIL_MESSAGES_URL + msg_id,
+                                      headers=headers, params=params) as resp:
+                resp.raise_for_status()
+                self._message_cache[msg_id] = await resp.json()
+        
+        results = await asyncio.gather(*(fetch(m['id']) for m in messages),
+                                       return_exceptions=True)
+        for m, result in zip(messages, results):
+            # Failed messages are fetched individually in create_action_file
+            if isinstance(result, Exception):
+                self.logger.warning(f"Could not fetch message {m['id']}: {result}")
+    
+    def _close_async(self):
+        """Close the aiohttp session and event loop used by async_fetch."""
+        if self._loop is None:
+            return
+        if self._http is not None and not self._http.closed:
+            self._loop.run_until_complete(self._http.close())
+        self._loop.close()
+        self._loop = None
+        self._http = None
+    
+    def _backoff(self):
+        """Sleep with exponential backoff after a rate-limit/server error."""
+        delay = min(2 ** self._backoff_level + random.random(), MAX_BACKOFF)
+        self._backoff_level += 1
+        self.logger.warning(f"Gmail API throttled, backing off {delay:.1f}s")
+        time.sleep(delay)
+    
+    def _recover(self):
+        """Step the backoff level down after a successful call."""
+        if self._backoff_level:
+            self._backoff_level -= 1
+    
+    def _on_message_fetched(self, request_id, response, exception):
+        """Batch callback - store fetched payload in the message cache."""
+        if exception is not None:
+            self.logger.warning(f"Could not fetch message {request_id}: {exception}")
+            return
+        self._message_cache[request_id] = response
+    
+    def _on_metadata_fetched(self, request_id, response, exception):
+        """Batch callback - store headers-only payload for triage."""
+        if exception is not None:
+            self.logger.warning(f"Could not fetch headers for {request_id}: {exception}")
+            return
+        self._metadata_cache[request_id] = response
+    
+    def _thread_service(self):
+        """Get a Gmail service for the current thread (httplib2 is not thread-safe)."""
+        if threading.current_thread() is threading.main_thread():
+            return self.service
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self._local.service = self._build_service(self._load_credentials())
+        return service
+    
     def create_action_file(self, message) -> Path:
         """Create markdown action file for email."""
         try:
-            msg = self.service.users().messages().get(
-                userId='me', id=message['id'], format='full'
-            ).execute()
+            msg = self._message_cache.pop(message['id'], None)
+            if msg is None:
+                # Not in batch results - fetch individually
+                msg = self._thread_service().users().messages().get(
+                    userId='me', id=message['id'], format='full', fields=MESSAGE_FIELDS
+                ).execute(num_retries=NUM_RETRIES)
             
             # Extract headers
             headers = {h['name']: h['value'] for h in msg['payload']['headers']}
@@ -206,79 +685,105 @@ class GmailWatcher(BaseWatcher):
             # Determine priority
             priority = self._determine_priority(headers.get('Subject', ''), body)
             
-            content = f'''---
-type: email
-from: {headers.get('From', 'Unknown')}
-to: {headers.get('To', '')}
-subject: {headers.get('Subject', 'No Subject')}
-received: {datetime.now().isoformat()}
-priority: {priority}
-status: pending
-message_id: {message['id']}
----
-
-# Email Content
-
-**From:** {headers.get('From', 'Unknown')}  
-**To:** {headers.get('To', '')}  
-**Subject:** {headers.get('Subject', 'No Subject')}  
-**Date:** {headers.get('Date', '')}
-
----
-
-{body if body else '*No text content*'}
-
----
-
-# Attachments
-{self._format_attachments(attachments) if attachments else '*No attachments*'}
-
-# Suggested Actions
-- [ ] Review email content
-- [ ] Reply to sender
-- [ ] Take required action
-- [ ] Archive after processing
-
----
-*Generated by Gmail Watcher v0.1 (Silver Tier)*
-'''
+            ctx = {
+                'from_': headers.get('From', 'Unknown'),
+                'to': headers.get('To', ''),
+                'subject': headers.get('Subject', 'No Subject'),
+                'date': headers.get('Date', ''),
+                'received': datetime.now().isoformat(),
+                'priority': priority,
+                'message_id': message['id'],
+                'body': body or '*No text content*',
+                'attachments': self._format_attachments(attachments) if attachments else '*No attachments*',
+            }
+            content = ACTION_FILE_TEMPLATE.format_map(ctx)
+            
             filepath = self.needs_action / f'EMAIL_{message["id"]}.md'
-            filepath.write_text(content)
+            self._write_action_file(filepath, content)
             
-            self.processed_ids.add(message['id'])
-            self._save_processed_ids()
+            received_ts = int(msg.get('internalDate', 0)) // 1000
+            with self._ids_lock:
+                self._unflushed_ids.append(message['id'])
+                if message['id'] in self._retry_ids:
+                    self._retry_ids.discard(message['id'])
+                    self._sync_state_dirty = True
+                if self._seen_bloom is not None:
+                    self._seen_bloom.add(message['id'])
+                if received_ts > self._last_seen_ts:
+                    self._last_seen_ts = received_ts
+                    self._sync_state_dirty = True
             
             return filepath
             
         except Exception as e:
             self.logger.error(f"Error creating action file: {e}")
+            if isinstance(e, HttpError) and e.resp.status == 404:
+                # Message deleted since it was listed - nothing left to retry
+                with self._ids_lock:
+                    self._retry_ids.discard(message['id'])
+                    self._sync_state_dirty = True
             raise
     
+    def _write_action_file(self, filepath: Path, content: str):
+        """Write action file with raw os calls; durability is deferred to flush()."""
+        data = memoryview(content.encode('utf-8'))
+        fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+        self._needs_action_dirty = True
+    
+    def _sync_needs_action(self):
+        """fsync the Needs_Action directory once to commit new file entries."""
+        if not self._needs_action_dirty:
+            return
+        self._needs_action_dirty = False
+        try:
+            fd = os.open(self.needs_action, os.O_RDONLY)
+        except OSError:
+            return  # Directories can't be opened on Windows
+        try:
+            os.fsync(fd)
+        except OSError as e:
+            self.logger.debug(f"Could not sync {self.needs_action}: {e}")
+        finally:
+            os.close(fd)
+    
     def _extract_body(self, payload) -> str:
-        """Extract email body from payload."""
-        body_parts = []
+        """Extract plain-text email body from payload (walks nested parts)."""
+        body = bytearray()
+        stack = [payload]
         
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    if 'data' in part.get('body', {}):
-                        data = part['body']['data']
-                        body_parts.append(base64.urlsafe_b64decode(data).decode('utf-8'))
+        while stack:
+            part = stack.pop()
+            if part.get('parts'):
+                # Reversed so parts pop off the stack in document order
+                stack.extend(reversed(part['parts']))
+            elif (part.get('mimeType') == 'text/plain' and not part.get('filename')
+                  and 'data' in part.get('body', {})):
+                if body:
+                    body += b'\n\n'
+                body += binascii.a2b_base64(part['body']['data'].translate(_URLSAFE_TO_STD))
         
-        return '\n\n'.join(body_parts) if body_parts else ""
+        return body.decode('utf-8', 'replace')
     
     def _get_attachments_info(self, payload) -> list:
-        """Get attachment information from payload."""
+        """Get attachment information from payload (walks nested parts)."""
         attachments = []
+        stack = [payload]
         
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['filename']:
-                    attachments.append({
-                        'filename': part['filename'],
-                        'size': part['body'].get('size', 0),
-                        'mime_type': part['mimeType']
-                    })
+        while stack:
+            part = stack.pop()
+            if part.get('parts'):
+                stack.extend(reversed(part['parts']))
+            elif part.get('filename'):
+                attachments.append({
+                    'filename': part['filename'],
+                    'size': part.get('body', {}).get('size', 0),
+                    'mime_type': part['mimeType']
+                })
         
         return attachments
     
@@ -292,17 +797,20 @@ message_id: {message['id']}
     
     def _determine_priority(self, subject: str, body: str) -> str:
         """Determine email priority based on content."""
-        high_priority_keywords = ['urgent', 'asap', 'immediately', 'emergency']
-        medium_priority_keywords = ['invoice', 'payment', 'deadline', 'review']
-        
-        text = (subject + ' ' + body).lower()
+        text = subject + ' ' + body
         
-        if any(kw in text for kw in high_priority_keywords):
+        if self._high_re.search(text):
             return 'high'
-        elif any(kw in text for kw in medium_priority_keywords):
+        elif self._med_re.search(text):
             return 'medium'
         return 'normal'
     
+    def flush(self):
+        """Sync action files, then record processed IDs and sync state."""
+        self._sync_needs_action()
+        self._save_processed_ids()
+        self._save_sync_state()
+    
     def run(self):
         """Main loop - continuously check for new emails."""
         self.logger.info('=' * 50)
@@ -317,7 +825,11 @@ message_id: {message['id']}
             self.logger.error("Failed to authenticate. Exiting.")
             return
         
-        super().run()
+        try:
+            super().run()
+        finally:
+            self._close_async()
+            self._db.close()
 
 
 def main():
@@ -334,6 +846,8 @@ def main():
                        help='Keywords to filter emails')
     parser.add_argument('--authenticate', '-a', action='store_true',
                        help='Run authentication flow')
+    parser.add_argument('--async-fetch', action='store_true',
+                       help='Fetch messages concurrently with aiohttp (requires aiohttp)')
     
     args = parser.parse_args()
     
@@ -370,7 +884,8 @@ def main():
         str(credentials_path),
         str(token_path),
         args.interval or 120,
-        args.keywords
+        args.keywords,
+        async_fetch=args.async_fetch
     )
     
     if args.authenticate:
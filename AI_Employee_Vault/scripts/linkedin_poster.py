@@ -13,7 +13,9 @@ Usage:
 """
 
 import sys
+import re
 import time
+import random
 import logging
 import argparse
 import json
@@ -333,7 +335,6 @@ Move this file to `/Rejected` folder with comments.
     
     def _extract_hashtags(self, markdown: str) -> List[str]:
         """Extract hashtags from markdown file."""
-        import re
         # Look for hashtags in frontmatter
         match = re.search(r'hashtags:\s*(.+)', markdown)
         if match:
@@ -387,7 +388,6 @@ Move this file to `/Rejected` folder with comments.
             ]
         }
         
-        import random
         return random.choice(templates.get(tone, templates['professional']))
 
 
@@ -17,30 +17,97 @@ import time
 import logging
 import argparse
 import json
+import hashlib
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
 
 try:
-    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+    from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeout
 except ImportError:
     print("Missing dependencies. Install with:")
     print("  pip install playwright")
     print("  playwright install chromium")
     sys.exit(1)
 
+# Optional: single-pass keyword matching (pip install pyahocorasick)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional: in-process HTML parsing for large notification lists (pip install selectolax)
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+# Notification IDs remembered across restarts (oldest evicted first)
+PROCESSED_FILE = '.linkedin_processed.json'
+MAX_PROCESSED = 10000
+
+# Cookies/localStorage saved after login, loaded into a fresh context per run
+STATE_FILE = 'state.json'
+
+# Page selectors
+_SEL_NOTIF_LIST = '[data-test-id="notification-list"]'
+_SEL_NOTIF_ITEM = '[data-test-id="notification-item"]'
+_SEL_START_POST = '[aria-label="Start a post"]'
+_SEL_EDITOR = '.ql-editor'
+_SEL_POST_BTN = 'button:has-text("Post")'
+_SEL_POST_TOAST = '.post-updated-toast, .toast'
+
+# Above this many notifications, parse page.content() in-process instead
+HTML_PARSE_THRESHOLD = 50
+
+# Reads id + text of the first N notification items in one browser round trip
+_JS_NOTIF_ITEMS = '''([sel, limit]) => Array.from(document.querySelectorAll(sel))
+    .slice(0, limit).map(e => ({id: e.id, text: e.innerText}))'''
+
+# Markdown for notification action files (filled with str.format)
+_NOTIF_TEMPLATE = '''---
+type: linkedin_notification
+received: {ts}
+keywords: {kws}
+status: pending
+---
+
+# LinkedIn Notification
+
+## Content
+
+{text}
+
+## Keywords Matched
+
+{kws}
+
+## Suggested Actions
+
+- [ ] Review notification
+- [ ] Respond if needed (comment/message)
+- [ ] Check LinkedIn for context
+- [ ] Archive after processing
+
+---
+*Generated by LinkedIn Watcher v0.1 (Silver Tier)*
+'''
+
 
 class LinkedInWatcher:
     """Monitor and post to LinkedIn using browser automation."""
     
     def __init__(self, vault_path: str, session_path: str,
-                 check_interval: int = 300, keywords: List[str] = None):
+                 check_interval: int = 300, keywords: List[str] = None,
+                 notification_limit: int = 10):
         """
         Initialize LinkedIn Watcher.
         
@@ -49,11 +116,15 @@ class LinkedInWatcher:
             session_path: Path to save browser session
             check_interval: Seconds between checks (default: 300 = 5 min)
             keywords: Keywords to monitor in notifications
+            notification_limit: Notifications read per check (default: 10)
         """
         self.vault_path = Path(vault_path)
         self.session_path = Path(session_path)
         self.check_interval = check_interval
+        self.notification_limit = notification_limit
         self.keywords = keywords or ['comment', 'message', 'connection', 'job']
+        self._keywords_lower = tuple(kw.lower() for kw in self.keywords)
+        self._kw_automaton = self._build_automaton(self._keywords_lower)
         
         self.needs_action = self.vault_path / 'Needs_Action'
         self.done = self.vault_path / 'Done'
@@ -65,6 +136,147 @@ class LinkedInWatcher:
         
         self.logger = logging.getLogger(self.__class__.__name__)
         self.processed_notifications = set()
+        self._processed_order = deque(maxlen=MAX_PROCESSED)
+        self._processed_path = self.vault_path / PROCESSED_FILE
+        self._load_processed()
+        
+        # Long-lived browser context owned by run(); one-shot calls launch
+        # their own. The sync API drives one page at a time, so a single
+        # page is reused across checks/posts.
+        self._context = None
+        self._page = None
+        self._relaunch = False  # set when the shared context stops responding
+    
+    def _load_processed(self):
+        """Load notification IDs handled by earlier runs."""
+        if not self._processed_path.exists():
+            return
+        try:
+            for notification_id in json.loads(self._processed_path.read_text()):
+                self._remember(notification_id)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not load processed notifications: {e}")
+    
+    def _remember(self, notification_id: str):
+        """Mark a notification as processed, evicting the oldest when full."""
+        if len(self._processed_order) == self._processed_order.maxlen:
+            self.processed_notifications.discard(self._processed_order[0])
+        self._processed_order.append(notification_id)
+        self.processed_notifications.add(notification_id)
+    
+    def _save_processed(self):
+        """Persist processed notification IDs."""
+        try:
+            self._processed_path.write_bytes(json.dumps(list(self._processed_order)).encode('utf-8'))
+        except OSError as e:
+            self.logger.warning(f"Could not save processed notifications: {e}")
+    
+    @staticmethod
+    def _build_automaton(keywords):
+        """Build an Aho-Corasick automaton over lowercase keywords, if available."""
+        if ahocorasick is None or not keywords:
+            return None
+        automaton = ahocorasick.Automaton()
+        for kw in keywords:
+            automaton.add_word(kw, kw)
+        automaton.make_automaton()
+        return automaton
+    
+    def _match_keywords(self, text_lower: str) -> List[str]:
+        """Return the keywords found in already-lowercased text."""
+        if self._kw_automaton is None:
+            return [kw for kw in self._keywords_lower if kw in text_lower]
+        return list(dict.fromkeys(kw for _, kw in self._kw_automaton.iter(text_lower)))
+    
+    def _launch_context(self, p):
+        """
+        Launch a headless browser context on the saved session.
+        
+        Uses the storage_state.json written by authenticate() when present,
+        which avoids loading the full profile directory; older sessions
+        without it fall back to the persistent profile.
+        """
+        args = [
+            '--disable-blink-features=AutomationControlled',
+            '--disable-dev-shm-usage',
+            '--no-sandbox'
+        ]
+        viewport = {'width': 1280, 'height': 720}
+        
+        state_path = self.session_path / STATE_FILE
+        if state_path.exists():
+            browser = p.chromium.launch(headless=True, args=args)
+            return browser.new_context(storage_state=str(state_path), viewport=viewport)
+        
+        return p.chromium.launch_persistent_context(
+            str(self.session_path), headless=True, args=args, viewport=viewport
+        )
+    
+    def _close_context(self, context):
+        """Close a context from _launch_context, saving refreshed cookies first."""
+        browser = context.browser  # None for persistent contexts
+        if browser is not None:
+            try:
+                context.storage_state(path=str(self.session_path / STATE_FILE))
+            except Exception as e:
+                self.logger.warning(f"Could not save session state: {e}")
+        context.close()
+        if browser is not None:
+            browser.close()
+    
+    @contextmanager
+    def _open_page(self):
+        """
+        Yield a page for a single check/post.
+        
+        Inside run() this is the context's reused page (reopened if it was
+        closed). Otherwise (--check / --post) a browser is launched and
+        closed around the call.
+        """
+        if self._context is not None:
+            try:
+                if self._page is None or self._page.is_closed():
+                    self._page = self._context.new_page()
+                yield self._page
+            except PlaywrightTimeout:
+                raise
+            except PlaywrightError:
+                # A crashed or disconnected browser fails every call from
+                # here on; have run() relaunch it before the next check
+                self._relaunch = True
+                raise
+            return
+        
+        with sync_playwright() as p:
+            context = self._launch_context(p)
+            try:
+                yield context.pages[0] if context.pages else context.new_page()
+            finally:
+                self._close_context(context)
+    
+    def _start_context(self, p):
+        """Launch the shared context used by run() and pick its page."""
+        self._context = self._launch_context(p)
+        self._page = self._context.pages[0] if self._context.pages else self._context.new_page()
+        self._relaunch = False
+    
+    def _stop_context(self):
+        """Close the shared context, tolerating an already dead browser."""
+        context, self._context, self._page = self._context, None, None
+        if context is None:
+            return
+        try:
+            self._close_context(context)
+        except Exception as e:
+            self.logger.warning(f"Could not close browser: {e}")
+    
+    def _context_lost(self) -> bool:
+        """Check whether the shared context needs relaunching."""
+        if self._relaunch or self._context is None:
+            return True
+        # Persistent contexts have no Browser; they rely on _relaunch
+        browser = self._context.browser
+        return browser is not None and not browser.is_connected()
     
     def authenticate(self) -> bool:
         """
@@ -92,6 +304,7 @@ class LinkedInWatcher:
                     page.wait_for_url('https://www.linkedin.com/feed/*', timeout=300000)
                     self.logger.info("Login detected!")
                     time.sleep(2)  # Let session fully load
+                    browser.storage_state(path=str(self.session_path / STATE_FILE))
                     browser.close()
                     return True
                 except PlaywrightTimeout:
@@ -113,51 +326,35 @@ class LinkedInWatcher:
         notifications = []
         
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch_persistent_context(
-                    str(self.session_path),
-                    headless=True,
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-dev-shm-usage',
-                        '--no-sandbox'
-                    ],
-                    viewport={'width': 1280, 'height': 720}
-                )
-                
-                page = browser.pages[0] if browser.pages else browser.new_page()
-                
+            with self._open_page() as page:
                 # Navigate to notifications
                 self.logger.debug("Navigating to LinkedIn notifications...")
-                page.goto('https://www.linkedin.com/notifications/', wait_until='networkidle')
+                page.goto('https://www.linkedin.com/notifications/', wait_until='domcontentloaded')
                 
                 # Wait for notifications list
                 try:
-                    page.wait_for_selector('[data-test-id="notification-list"]', timeout=15000)
+                    page.wait_for_selector(_SEL_NOTIF_LIST, timeout=15000)
                     self.logger.debug("Notifications loaded")
                 except PlaywrightTimeout:
                     self.logger.warning("Notifications did not load. May need to re-authenticate.")
-                    browser.close()
                     return []
                 
-                # Small delay for content to load
-                time.sleep(2)
-                
                 # Find notification items
                 try:
-                    notification_items = page.query_selector_all('[data-test-id="notification-item"]')
+                    notification_items = self._read_notification_items(page)
                     self.logger.debug(f"Found {len(notification_items)} notifications")
                     
-                    for item in notification_items[:10]:  # Limit to 10
+                    for item in notification_items:
                         try:
-                            text = item.inner_text(timeout=2000)
-                            notification_id = item.get_attribute('id') or str(hash(text))
+                            text = item['text'] or ''
+                            notification_id = item['id'] or hashlib.blake2b(
+                                text.encode('utf-8'), digest_size=8).hexdigest()
                             
                             # Check if already processed
                             if notification_id not in self.processed_notifications:
                                 # Check for keywords
                                 text_lower = text.lower()
-                                matched = [kw for kw in self.keywords if kw in text_lower]
+                                matched = self._match_keywords(text_lower)
                                 
                                 if matched:
                                     notifications.append({
@@ -166,7 +363,7 @@ class LinkedInWatcher:
                                         'keywords': matched,
                                         'timestamp': datetime.now().isoformat()
                                     })
-                                    self.processed_notifications.add(notification_id)
+                                    self._remember(notification_id)
                                     self.logger.info(f"Found notification with keywords: {matched}")
                         except Exception:
                             continue
@@ -174,13 +371,25 @@ class LinkedInWatcher:
                 except Exception as e:
                     self.logger.error(f"Error finding notifications: {e}")
                 
-                browser.close()
-                
         except Exception as e:
             self.logger.error(f"Error checking notifications: {e}")
         
+        if notifications:
+            self._save_processed()
         return notifications
     
+    def _read_notification_items(self, page) -> List[Dict]:
+        """Return id/text dicts for the first notification_limit items on the page."""
+        limit = self.notification_limit
+        if limit > HTML_PARSE_THRESHOLD and HTMLParser is not None:
+            # One page.content() transfer + C-level parse beats a large evaluate payload
+            tree = HTMLParser(page.content())
+            return [
+                {'id': node.attributes.get('id') or '', 'text': node.text(separator='\n', strip=True)}
+                for node in tree.css(_SEL_NOTIF_ITEM)[:limit]
+            ]
+        return page.evaluate(_JS_NOTIF_ITEMS, [_SEL_NOTIF_ITEM, limit])
+    
     def post_update(self, content: str, hashtags: List[str] = None,
                     screenshot: bool = True) -> Dict:
         """
@@ -197,31 +406,17 @@ class LinkedInWatcher:
         result = {'status': 'unknown', 'content': content}
         
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch_persistent_context(
-                    str(self.session_path),
-                    headless=True,
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-dev-shm-usage',
-                        '--no-sandbox'
-                    ],
-                    viewport={'width': 1280, 'height': 720}
-                )
-                
-                page = browser.pages[0] if browser.pages else browser.new_page()
-                
+            with self._open_page() as page:
                 # Navigate to feed
                 self.logger.debug("Navigating to LinkedIn feed...")
-                page.goto('https://www.linkedin.com/feed/', wait_until='networkidle')
+                page.goto('https://www.linkedin.com/feed/', wait_until='domcontentloaded')
                 
                 # Wait for post creation box
                 try:
-                    page.wait_for_selector('[aria-label="Start a post"]', timeout=30000)
+                    page.wait_for_selector(_SEL_START_POST, timeout=30000)
                     self.logger.debug("Feed loaded")
                 except PlaywrightTimeout:
                     self.logger.error("Feed did not load. May need to re-authenticate.")
-                    browser.close()
                     result['status'] = 'auth_error'
                     return result
                 
@@ -230,11 +425,10 @@ class LinkedInWatcher:
                 
                 # Click "Start a post"
                 self.logger.debug("Clicking 'Start a post'...")
-                page.click('[aria-label="Start a post"]')
+                page.click(_SEL_START_POST)
                 
                 # Wait for post dialog
-                page.wait_for_selector('.ql-editor', timeout=10000)
-                time.sleep(1)
+                page.wait_for_selector(_SEL_EDITOR, timeout=10000)
                 
                 # Prepare content with hashtags
                 full_content = content
@@ -244,19 +438,19 @@ class LinkedInWatcher:
                 
                 # Type content
                 self.logger.debug("Typing content...")
-                page.fill('.ql-editor', full_content)
+                page.fill(_SEL_EDITOR, full_content)
                 
                 # Human-like delay
                 time.sleep(2)
                 
                 # Click "Post" button
                 self.logger.debug("Clicking 'Post'...")
-                post_button = page.locator('button:has-text("Post")').first
+                post_button = page.locator(_SEL_POST_BTN).first
                 post_button.click()
                 
                 # Wait for success toast
                 try:
-                    page.wait_for_selector('.post-updated-toast, .toast', timeout=10000)
+                    page.wait_for_selector(_SEL_POST_TOAST, timeout=10000)
                     self.logger.info("Post successful!")
                     result['status'] = 'posted'
                     result['timestamp'] = datetime.now().isoformat()
@@ -271,8 +465,6 @@ class LinkedInWatcher:
                     result['screenshot'] = str(screenshot_path)
                     self.logger.info(f"Screenshot saved: {screenshot_path.name}")
                 
-                browser.close()
-                
         except Exception as e:
             self.logger.error(f"Error posting: {e}")
             result['status'] = 'error'
@@ -285,35 +477,10 @@ class LinkedInWatcher:
         timestamp = datetime.now().isoformat()
         filename = f'LINKEDIN_NOTIF_{int(time.time())}.md'
         
-        content = f'''---
-type: linkedin_notification
-received: {timestamp}
-keywords: {', '.join(notification['keywords'])}
-status: pending
----
-
-# LinkedIn Notification
-
-## Content
-
-{notification['text']}
-
-## Keywords Matched
-
-{', '.join(notification['keywords'])}
-
-## Suggested Actions
-
-- [ ] Review notification
-- [ ] Respond if needed (comment/message)
-- [ ] Check LinkedIn for context
-- [ ] Archive after processing
-
----
-*Generated by LinkedIn Watcher v0.1 (Silver Tier)*
-'''
+        kws = ', '.join(notification['keywords'])
+        content = _NOTIF_TEMPLATE.format(ts=timestamp, kws=kws, text=notification['text'])
         filepath = self.needs_action / filename
-        filepath.write_text(content)
+        filepath.write_bytes(content.encode('utf-8'))
         
         self.logger.info(f"Created notification action file: {filename}")
         return filepath
@@ -336,17 +503,33 @@ status: pending
         
         self.logger.info("Starting notification monitoring...")
         
-        while True:
+        # Launch the browser once and reuse its page for every check/post
+        with sync_playwright() as p:
+            self._start_context(p)
             try:
-                notifications = self.check_notifications()
-                
-                for notif in notifications:
-                    self.create_notification_action_file(notif)
-                
-            except Exception as e:
-                self.logger.error(f"Error in check loop: {e}")
-            
-            time.sleep(self.check_interval)
+                while True:
+                    if self._context_lost():
+                        self.logger.warning("Browser stopped responding - relaunching")
+                        self._stop_context()
+                        try:
+                            self._start_context(p)
+                        except Exception as e:
+                            self.logger.error(f"Could not relaunch browser: {e}")
+                            time.sleep(self.check_interval)
+                            continue
+                    
+                    try:
+                        notifications = self.check_notifications()
+                        
+                        for notif in notifications:
+                            self.create_notification_action_file(notif)
+                        
+                    except Exception as e:
+                        self.logger.error(f"Error in check loop: {e}")
+                    
+                    time.sleep(self.check_interval)
+            finally:
+                self._stop_context()
 
 
 def main():
@@ -365,6 +548,8 @@ def main():
                        help='Hashtags for post (default: business tech)')
     parser.add_argument('--check', '-c', action='store_true',
                        help='Check notifications once')
+    parser.add_argument('--limit', '-l', type=int,
+                       help='Notifications to read per check (default: 10)')
     parser.add_argument('--config', help='Path to config JSON file')
     
     args = parser.parse_args()
@@ -389,7 +574,8 @@ def main():
         str(vault_path),
         str(session_path),
         args.interval or config.get('check_interval', 300),
-        args.keywords or config.get('keywords', ['comment', 'message', 'connection', 'job'])
+        args.keywords or config.get('keywords', ['comment', 'message', 'connection', 'job']),
+        notification_limit=args.limit or config.get('notification_limit', 10)
     )
     
     if args.authenticate:
@@ -16,13 +16,24 @@ Or run in background:
     python orchestrator.py ./AI_Employee_Vault &
 """
 
+import os
 import sys
+import atexit
 import re
-import subprocess
+import json
+import time
+import asyncio
+import shutil
+import platform
+from string import Template
 import logging
+from collections import deque
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
+from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
+from watchdog.events import FileSystemEventHandler
 
 # Configure logging
 logging.basicConfig(
@@ -30,6 +41,112 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+# Dashboard fields rewritten by update_dashboard (one pass, dispatched by group name)
+_DASHBOARD_RE = re.compile(
+    r'(?P<last_updated>last_updated: .*\n)'
+    r'|(?P<pending>\| \*\*Pending Items\*\* \| \d+ \|)'
+    r'|(?P<approval>\| \*\*Awaiting Approval\*\* \| \d+ \|)'
+)
+
+# Frontmatter fields and body sections read from approval files
+_FIELD_RES = {
+    name: re.compile(rf'^{name}:\s*(.+)$', re.MULTILINE)
+    for name in ('from', 'to', 'subject', 'received', 'priority', 'message_id', 'action')
+}
+# Body section headers (## or deeper), in order of preference
+_BODY_SECTIONS = ('Suggested Reply', 'Reply Content', 'Content', 'Email Body')
+_BODY_HEADER_RE = re.compile(
+    r'^#{2,}[ \t]+(' + '|'.join(_BODY_SECTIONS) + r')[ \t]*\n', re.MULTILINE
+)
+_SECTION_END_RE = re.compile(r'^(?:#{2,}|---)', re.MULTILINE)
+_BULLET_RE = re.compile(r'^\s*\*\s*', re.MULTILINE)
+
+# Characters cmd.exe acts on even inside a quoted argument to a .cmd file
+_CMD_UNSAFE_RE = re.compile(r'[\x00-\x1f"%!^&|<>]')
+
+# Filesystems where inotify & co. miss changes made by other hosts
+NETWORK_FS_TYPES = {'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'fuse.sshfs', '9p'}
+
+# Quiet period after a file event so a burst of files reaches Qwen as one batch
+DEBOUNCE_SECONDS = 2.0
+
+# Event-maintained folder counts are re-scanned this often to correct drift
+COUNT_RESYNC_SECONDS = 3600
+
+# A folder mtime is only trusted to skip a sweep once it is this old, so
+# a file created in the same (coarse, up to 2s on FAT/HFS+) tick still shows
+MTIME_SETTLE_NS = 3 * 10**9
+
+# Processed file names; only the most recent are persisted across restarts
+PROCESSED_FILE = '.processed.json'
+RECENT_PROCESSED = 500
+
+
+def _count_md(path: Path) -> int:
+    """Count .md files in a folder with a single scandir pass."""
+    n = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name.endswith('.md') and entry.is_file(follow_symlinks=False):
+                n += 1
+    return n
+
+
+def _is_network_fs(path: Path) -> bool:
+    """Return True if path lives on a network mount (Linux only, via /proc/mounts)."""
+    try:
+        with open('/proc/mounts') as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    
+    path = str(path.resolve())
+    best, fstype = '', ''
+    for mount_point, mount_type in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+        if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) \
+                and len(mount_point) > len(best):
+            best, fstype = mount_point, mount_type
+    return fstype in NETWORK_FS_TYPES
+
+
+class FolderEventHandler(FileSystemEventHandler):
+    """Reports .md files arriving in or leaving the watched folders."""
+    
+    def __init__(self, notify: Callable[[Path, int], None], folders: List[Path]):
+        """
+        Initialize the handler.
+        
+        Args:
+            notify: Called (from the observer thread) with the folder and
+                +1 for a file added or -1 for a file removed
+            folders: Folders to report on
+        """
+        self.notify = notify
+        self.folders = {str(folder): folder for folder in folders}
+    
+    def _queue(self, path: str, delta: int):
+        if path.endswith('.md'):
+            folder = self.folders.get(os.path.dirname(path))
+            if folder is not None:
+                self.notify(folder, delta)
+    
+    def on_created(self, event):
+        """Handle file creation events."""
+        if not event.is_directory:
+            self._queue(event.src_path, 1)
+    
+    def on_deleted(self, event):
+        """Handle file deletion events."""
+        if not event.is_directory:
+            self._queue(event.src_path, -1)
+    
+    def on_moved(self, event):
+        """Handle files moved or renamed between (or into/out of) watched folders."""
+        if not event.is_directory:
+            self._queue(event.src_path, -1)
+            self._queue(event.dest_path, 1)
+
 
 class Orchestrator:
     """Main orchestrator for the AI Employee system."""
@@ -59,14 +176,89 @@ class Orchestrator:
         self.dashboard = self.vault_path / 'Dashboard.md'
         self.handbook = self.vault_path / 'Company_Handbook.md'
         
+        # String prefixes for building paths in per-item loops
+        self._done_prefix = str(self.done) + os.sep
+        self._scripts_dir = str(Path(__file__).parent)
+        
         # Ensure all folders exist
         for folder in [self.inbox, self.needs_action, self.done, 
                        self.pending_approval, self.approved, self.plans,
                        self.accounting, self.briefings, self.logs]:
             folder.mkdir(parents=True, exist_ok=True)
         
-        # Track processed files to avoid duplicates
+        # Track processed files to avoid duplicates (exact set, pruned to
+        # what is still in Needs_Action on every scan)
         self.processed_files = set()
+        self._recent_processed = deque(maxlen=RECENT_PROCESSED)
+        self._processed_path = self.vault_path / PROCESSED_FILE
+        self._load_processed()
+        
+        # On Windows the npm shim is qwen.cmd; it is run directly (no shell)
+        self._windows = platform.system() == 'Windows'
+        self._qwen_cmd = 'qwen.cmd' if self._windows else 'qwen'
+        # Resolve once so each run skips the PATH search
+        self._qwen_path = shutil.which(self._qwen_cmd) or self._qwen_cmd
+        
+        # Last dashboard write, to skip rewrites when nothing changed
+        self._last_counts = None
+        self._last_dashboard_mtime = 0
+        self._dashboard_tmpl = None  # Dashboard.md with $-slots for the live fields
+        
+        # Folder mtimes from the last pass; unchanged + empty means nothing to do.
+        # Only used on timed sweeps - file events always force a scan - and
+        # never on network mounts, where cached attributes lag behind
+        self._network_fs = _is_network_fs(self.vault_path)
+        self._na_dir_mtime = 0
+        self._na_had_items = False
+        self._ap_dir_mtime = 0
+        self._ap_had_items = False
+        
+        # Folder counts kept while run() is active; a folder is re-listed
+        # after it has file events (a delta would miss rename-over-existing)
+        self._count_folders = {
+            self.needs_action: 'needs_action',
+            self.pending_approval: 'pending_approval',
+            self.approved: 'approved',
+            self.done: 'done',
+            self.plans: 'plans',
+        }
+        self._counts = None
+        self._counts_synced = 0.0
+        self._stale_counts = set()  # folders with events since their last count
+        
+        # Background processor tasks, one per folder, and folders that
+        # changed while their processor was still running
+        self._tasks = {}
+        self._rerun = set()
+        
+        # Today's action log, kept open and buffered between log_action calls;
+        # flushed after each pass, on failures and at exit
+        self._log_date = None
+        self._log_fp = None
+        atexit.register(self._close_log)
+    
+    def _load_processed(self):
+        """Restore recently processed file names from the last run."""
+        if not self._processed_path.exists():
+            return
+        try:
+            names = json.loads(self._processed_path.read_text())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f'Could not load processed files: {e}')
+            return
+        for name in names:
+            self.processed_files.add(name)
+            self._recent_processed.append(name)
+    
+    def _mark_processed(self, names: List[str]):
+        """Record file names as processed and persist the recent ones."""
+        for name in names:
+            self.processed_files.add(name)
+            self._recent_processed.append(name)
+        try:
+            self._processed_path.write_text(json.dumps(list(self._recent_processed)))
+        except OSError as e:
+            self.logger.warning(f'Could not save processed files: {e}')
     
     def get_pending_items(self) -> List[Path]:
         """Get all .md files in Needs_Action folder that haven't been processed."""
@@ -74,65 +266,123 @@ class Orchestrator:
             return []
         
         pending = []
-        for f in self.needs_action.glob('*.md'):
-            if f.name not in self.processed_files:
-                pending.append(f)
+        still_listed = set()
+        with os.scandir(self.needs_action) as it:
+            for entry in it:
+                if not (entry.name.endswith('.md') and entry.is_file(follow_symlinks=False)):
+                    continue
+                if entry.name in self.processed_files:
+                    still_listed.add(entry.name)
+                else:
+                    pending.append((entry.stat().st_mtime, entry.name))
+        
+        # Forget processed names that have left Needs_Action, so the set
+        # stays as small as the folder itself
+        self.processed_files = still_listed
         
         # Sort by modification time (oldest first)
-        pending.sort(key=lambda x: x.stat().st_mtime)
-        return pending
+        pending.sort()
+        return [self.needs_action / name for _, name in pending]
     
     def get_approved_items(self) -> List[Path]:
         """Get all items in Approved folder ready for action."""
         if not self.approved.exists():
             return []
-        return list(self.approved.glob('*.md'))
+        with os.scandir(self.approved) as it:
+            return [Path(entry.path) for entry in it
+                    if entry.name.endswith('.md') and entry.is_file(follow_symlinks=False)]
     
     def count_items(self) -> Dict[str, int]:
-        """Count items in each folder."""
-        return {
-            'needs_action': len(list(self.needs_action.glob('*.md'))),
-            'pending_approval': len(list(self.pending_approval.glob('*.md'))),
-            'approved': len(list(self.approved.glob('*.md'))),
-            'done': len(list(self.done.glob('*.md'))),
-            'plans': len(list(self.plans.glob('*.md'))),
-        }
+        """Count items in each folder (from file events when run() is active)."""
+        if self._counts is not None:
+            return dict(self._counts)
+        return self._scan_counts()
+    
+    def _scan_counts(self) -> Dict[str, int]:
+        """Count items in each folder by listing them."""
+        return {key: _count_md(folder) for folder, key in self._count_folders.items()}
+    
+    def _refresh_counts(self):
+        """Re-list the folders that had file events since they were last counted."""
+        if self._counts is not None:
+            for folder in self._stale_counts:
+                self._counts[self._count_folders[folder]] = _count_md(folder)
+        self._stale_counts.clear()
+    
+    def _on_folder_event(self, folder: Path, delta: int, events: asyncio.Queue):
+        """Mark the folder's count stale and wake the loop (with the folder for new work)."""
+        self._stale_counts.add(folder)
+        if delta > 0 and folder in (self.needs_action, self.approved):
+            events.put_nowait(folder)
+        else:
+            events.put_nowait(False)  # False = dashboard refresh only
     
     def update_dashboard(self):
         """Update the Dashboard.md with current status."""
         counts = self.count_items()
-        timestamp = datetime.now().isoformat()
 
         if self.dashboard.exists():
-            content = self.dashboard.read_text()
+            # Skip when counts are unchanged and nobody else edited the file
+            mtime = self.dashboard.stat().st_mtime_ns
+            if counts == self._last_counts and mtime == self._last_dashboard_mtime:
+                return
+            
+            # Re-read the dashboard only if it changed since our last write
+            if self._dashboard_tmpl is None or mtime != self._last_dashboard_mtime:
+                self._dashboard_tmpl = self._load_dashboard_template()
             
-            # Update last_updated in frontmatter
-            content = re.sub(
-                r'last_updated: .*\n',
-                f'last_updated: {timestamp}\n',
-                content
+            # Update last_updated, pending items and awaiting approval
+            timestamp = datetime.now().isoformat()
+            content = self._dashboard_tmpl.substitute(
+                last_updated=f'last_updated: {timestamp}\n',
+                pending=f'| **Pending Items** | {counts["needs_action"]} |',
+                approval=f'| **Awaiting Approval** | {counts["pending_approval"]} |',
             )
 
-            # Update pending items count
-            if '| **Pending Items** |' in content:
-                content = re.sub(
-                    r'\| \*\*Pending Items\*\* \| \d+ \|',
-                    f'| **Pending Items** | {counts["needs_action"]} |',
-                    content
-                )
-
-            # Update awaiting approval
-            if '| **Awaiting Approval** |' in content:
-                content = re.sub(
-                    r'\| \*\*Awaiting Approval\*\* \| \d+ \|',
-                    f'| **Awaiting Approval** | {counts["pending_approval"]} |',
-                    content
-                )
-
-            self.dashboard.write_text(content)
+            # Write a sibling file and swap it in so a crash never leaves a torn dashboard
+            tmp = self.dashboard.with_suffix('.md.tmp')
+            tmp.write_text(content, encoding='utf-8')
+            os.replace(tmp, self.dashboard)
+            self._last_counts = counts
+            self._last_dashboard_mtime = self.dashboard.stat().st_mtime_ns
             self.logger.info('Dashboard updated')
 
-    def trigger_qwen(self, prompt: str) -> bool:
+    def _load_dashboard_template(self) -> Template:
+        """Read Dashboard.md and turn its live fields into template slots."""
+        content = self.dashboard.read_text(encoding='utf-8')
+        parts = []
+        pos = 0
+        for match in _DASHBOARD_RE.finditer(content):
+            parts.append(content[pos:match.start()].replace('$', '$$'))
+            parts.append(f'${{{match.lastgroup}}}')
+            pos = match.end()
+        parts.append(content[pos:].replace('$', '$$'))
+        return Template(''.join(parts))
+    
+    async def _run_command(self, cmd: List[str], timeout: int, cwd: str):
+        """
+        Run a command without blocking the event loop.
+        
+        Returns:
+            (returncode, stdout, stderr) with output decoded as text
+        
+        Raises:
+            asyncio.TimeoutError: If the command runs longer than timeout
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, cwd=cwd,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        finally:
+            if proc.returncode is None:  # timed out or cancelled
+                proc.kill()
+                await proc.wait()
+        return (proc.returncode, stdout.decode('utf-8', 'replace'),
+                stderr.decode('utf-8', 'replace'))
+    
+    async def trigger_qwen(self, prompt: str) -> bool:
         """
         Trigger Qwen Code to process items.
 
@@ -143,45 +393,26 @@ class Orchestrator:
             True if successful, False otherwise
         """
         try:
-            # Build the qwen command
-            # On Windows, use qwen.cmd and shell=True for proper PATH resolution
-            import platform
-            import os
-            use_shell = platform.system() == 'Windows'
-            cmd_name = 'qwen.cmd' if use_shell else 'qwen'
-            
-            # Save current directory
-            original_cwd = os.getcwd()
-            
-            # Change to vault directory
-            os.chdir(str(self.vault_path))
-            
-            # Build command string for shell execution
             # Qwen Code accepts positional prompt directly
-            cmd_string = f'{cmd_name} "{prompt}"'
+            cmd = [self._qwen_path, prompt]
 
             self.logger.info(f'Triggering Qwen Code: {prompt[:50]}...')
 
-            # Run qwen code (non-interactive mode)
-            result = subprocess.run(
-                cmd_string,
-                shell=use_shell,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
+            # Run qwen code (non-interactive mode) from the vault directory
+            returncode, _, stderr = await self._run_command(
+                cmd,
+                timeout=300,  # 5 minute timeout
+                cwd=str(self.vault_path)
             )
-            
-            # Restore original directory
-            os.chdir(original_cwd)
 
-            if result.returncode == 0:
+            if returncode == 0:
                 self.logger.info('Qwen Code completed successfully')
                 return True
             else:
-                self.logger.error(f'Qwen Code error: {result.stderr}')
+                self.logger.error(f'Qwen Code error: {stderr}')
                 return False
 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             self.logger.error('Qwen Code timed out')
             return False
         except FileNotFoundError:
@@ -191,15 +422,39 @@ class Orchestrator:
             self.logger.error(f'Error triggering Qwen Code: {e}')
             return False
     
-    def process_needs_action(self):
+    def _settled_mtime(self, mtime_ns: int) -> int:
+        """Return a folder mtime safe to skip later sweeps on, or 0 to always scan."""
+        if self._network_fs or time.time_ns() - mtime_ns < MTIME_SETTLE_NS:
+            return 0
+        return mtime_ns
+    
+    async def process_needs_action(self):
         """Process all items in Needs_Action folder."""
+        mtime = self.needs_action.stat().st_mtime_ns
+        if mtime == self._na_dir_mtime and not self._na_had_items:
+            return
+        self._na_dir_mtime = self._settled_mtime(mtime)
+        
         pending = self.get_pending_items()
+        self._na_had_items = bool(pending)
 
         if not pending:
             return
 
         self.logger.info(f'Found {len(pending)} pending item(s)')
 
+        # Windows runs qwen.cmd through cmd.exe, which would interpret these
+        # characters inside the prompt argument - never pass such names on
+        if self._windows:
+            unsafe = [f.name for f in pending if _CMD_UNSAFE_RE.search(f.name)]
+            if unsafe:
+                for name in unsafe:
+                    self.logger.warning(f'Skipping {name}: rename it without any of " % ! ^ & | < >')
+                self._mark_processed(unsafe)
+                pending = [f for f in pending if f.name not in unsafe]
+                if not pending:
+                    return
+
         # Build prompt for Qwen - more specific instructions
         files = ', '.join([f.name for f in pending])
         prompt = f"""I have {len(pending)} item(s) in /Needs_Action that need processing: {files}
@@ -219,70 +474,82 @@ Please follow this workflow:
 
 Be specific and create actual files, not just suggestions."""
 
-        if self.trigger_qwen(prompt):
+        if await self.trigger_qwen(prompt):
             # Mark files as processed
-            for f in pending:
-                self.processed_files.add(f.name)
+            self._mark_processed([f.name for f in pending])
 
-    def process_approved(self):
+    async def process_approved(self):
         """Process items that have been approved by human."""
+        mtime = self.approved.stat().st_mtime_ns
+        if mtime == self._ap_dir_mtime and not self._ap_had_items:
+            return
+        self._ap_dir_mtime = self._settled_mtime(mtime)
+        
         approved = self.get_approved_items()
+        self._ap_had_items = bool(approved)
 
         if not approved:
             return
 
         self.logger.info(f'Found {len(approved)} approved item(s) ready for action')
 
-        for item in approved:
-            self.logger.info(f'Processing: {item.name}')
-            
-            # Read the approved file
-            content = item.read_text()
-            
-            # Extract action type
-            action_type = self._extract_field(content, 'action')
-            
-            self.logger.info(f'Action type: {action_type}')
-            
-            if action_type == 'email_send':
-                # Extract email details
-                to_email = self._extract_field(content, 'to')
-                subject = self._extract_field(content, 'subject')
-                
-                # Extract body from the approval file
-                body = self._extract_email_body(content)
-                
-                if not to_email or not subject:
-                    self.logger.error(f'Missing email details in {item.name}')
-                    continue
-                
-                self.logger.info(f"Sending email to {to_email}")
-                self.logger.info(f"Subject: {subject}")
-                
-                # Send email using send_email.py script
-                result = self._send_email_via_script(to_email, subject, body)
-                
-                if result.get('status') == 'sent':
-                    self.logger.info(f"✓ Email sent successfully!")
-                    self.log_action('email_sent', f"To: {to_email}, Subject: {subject}")
-                else:
-                    self.logger.error(f"✗ Email send failed: {result}")
-            else:
-                self.logger.info(f'Unknown action type: {action_type}')
-            
-            # Move to Done after processing
-            dest = self.done / item.name
-            try:
-                item.rename(dest)
-                self.logger.info(f'Moved to Done: {dest.name}')
-                self.processed_files.add(item.name)
-            except Exception as e:
-                self.logger.error(f'Error moving file: {e}')
+        # Handle items concurrently (email sends are independent subprocesses)
+        await asyncio.gather(*(self._handle_approved(item) for item in approved))
     
-    def _send_email_via_script(self, to: str, subject: str, body: str) -> dict:
-        """Send email using send_email.py script."""
-        import subprocess
+    async def _handle_approved(self, item: Path):
+        """Carry out one approved item and move it to Done."""
+        self.logger.info(f'Processing: {item.name}')
+        
+        # Read the approved file
+        content = item.read_text(encoding='utf-8')
+        
+        # Parse frontmatter once for the action type and email details
+        fields = self._parse_frontmatter(content)
+        action_type = fields.get('action', '')
         
+        self.logger.info(f'Action type: {action_type}')
+        
+        if action_type != 'email_send':
+            self.logger.info(f'Unknown action type: {action_type}')
+            self._move_to_done(item)
+            return
+        
+        # Extract email details
+        to_email = fields.get('to', '')
+        subject = fields.get('subject', '')
+        
+        # Extract body from the approval file
+        body = self._extract_email_body(content)
+        
+        if not to_email or not subject:
+            self.logger.error(f'Missing email details in {item.name}')
+            return
+        
+        self.logger.info(f"Sending email to {to_email}")
+        self.logger.info(f"Subject: {subject}")
+        
+        # Send email using send_email.py script
+        result = await self._send_email_via_script(to_email, subject, body)
+        
+        if result.get('status') == 'sent':
+            self.logger.info(f"✓ Email sent successfully!")
+            self.log_action('email_sent', f"To: {to_email}, Subject: {subject}")
+        else:
+            self.logger.error(f"✗ Email send failed: {result}")
+        
+        self._move_to_done(item)
+    
+    def _move_to_done(self, item: Path):
+        """Move a processed approved item to Done."""
+        try:
+            os.rename(item, self._done_prefix + item.name)
+            self.logger.info(f'Moved to Done: {item.name}')
+            self._mark_processed([item.name])
+        except Exception as e:
+            self.logger.error(f'Error moving file: {e}')
+    
+    async def _send_email_via_script(self, to: str, subject: str, body: str) -> dict:
+        """Send email using send_email.py script."""
         try:
             # Build command
             cmd = [
@@ -296,76 +563,81 @@ Be specific and create actual files, not just suggestions."""
             
             self.logger.info(f"Running: {' '.join(cmd)}")
             
-            result = subprocess.run(
-                cmd,
-                cwd=str(Path(__file__).parent),
-                capture_output=True,
-                text=True,
-                timeout=60
+            returncode, stdout, stderr = await self._run_command(
+                cmd, timeout=60, cwd=self._scripts_dir
             )
             
-            self.logger.info(f"stdout: {result.stdout}")
-            self.logger.info(f"stderr: {result.stderr}")
+            self.logger.info(f"stdout: {stdout}")
+            self.logger.info(f"stderr: {stderr}")
             
-            if result.returncode == 0 and 'Email sent successfully' in result.stdout:
+            if returncode == 0 and 'Email sent successfully' in stdout:
                 return {'status': 'sent'}
             else:
-                return {'status': 'error', 'error': result.stderr or 'Unknown error'}
+                return {'status': 'error', 'error': stderr or 'Unknown error'}
                 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {'status': 'error', 'error': 'Timeout'}
         except Exception as e:
             return {'status': 'error', 'error': str(e)}
     
+    def _parse_frontmatter(self, content: str) -> Dict[str, str]:
+        """
+        Read all `field: value` lines in one pass.
+        
+        Only the ---/--- frontmatter block is scanned when present; the
+        first occurrence of each field wins, as with _extract_field.
+        """
+        block = content
+        if content.startswith('---'):
+            parts = content.split('---\n', 2)
+            if len(parts) == 3:
+                block = parts[1]
+        
+        fields = {}
+        for line in block.splitlines():
+            key, sep, value = line.partition(':')
+            value = value.strip()
+            if sep and value and key and key == key.strip() and key not in fields:
+                fields[key] = value
+        return fields
+    
     def _extract_field(self, content: str, field: str, default: str = '') -> str:
         """Extract field from markdown content."""
-        import re
         # Try frontmatter format first (field: value)
-        match = re.search(rf'^{field}:\s*(.+)$', content, re.MULTILINE)
+        pattern = _FIELD_RES.get(field) or re.compile(rf'^{field}:\s*(.+)$', re.MULTILINE)
+        match = pattern.search(content)
         if match:
             return match.group(1).strip()
         return default
     
     def _extract_email_body(self, content: str) -> str:
         """Extract email body from approval file."""
-        import re
-        
-        # Look for body after various section headers
-        patterns = [
-            r'## Suggested Reply\s*\n(.*?)(?:^##|^---|\Z)',  # ## Suggested Reply
-            r'## Reply Content\s*\n(.*?)(?:^##|^---|\Z)',     # ## Reply Content
-            r'## Content\s*\n(.*?)(?:^##|^---|\Z)',           # ## Content
-            r'## Email Body\s*\n(.*?)(?:^##|^---|\Z)',        # ## Email Body
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, content, re.DOTALL | re.MULTILINE)
-            if match:
-                body = match.group(1).strip()
+        # Find all candidate section headers in one scan
+        starts = {}
+        for match in _BODY_HEADER_RE.finditer(content):
+            starts.setdefault(match.group(1), match.end())
+        
+        # Take the preferred section; it runs to the next ##/### or --- line
+        for section in _BODY_SECTIONS:
+            if section in starts:
+                start = starts[section]
+                end = _SECTION_END_RE.search(content, start)
+                body = content[start:end.start() if end else len(content)].strip()
                 # Remove markdown formatting
-                body = re.sub(r'^\s*\*\s*', '', body, flags=re.MULTILINE)
-                return body
+                return _BULLET_RE.sub('', body)
         
         # If no section found, return content after frontmatter
-        lines = content.split('\n')
-        in_body = False
-        body_lines = []
-        
-        for line in lines:
-            if line.strip() == '---' and not in_body:
-                in_body = True
-                continue
-            if in_body and not line.startswith('---'):
-                if line.startswith('#'):
-                    continue  # Skip headers
-                body_lines.append(line)
-        
-        return '\n'.join(body_lines).strip()
-    
-    def send_email_via_mcp(self, to: str, subject: str, body: str) -> dict:
-        """Send email using Email MCP Server."""
-        import subprocess
+        _, _, rest = content.partition('---\n')
+        _, closed, after = rest.partition('\n---\n')
+        lines = (after if closed else rest).split('\n')
         
+        # Skip headers and horizontal rules
+        return '\n'.join(
+            line for line in lines if not line.startswith(('#', '---'))
+        ).strip()
+    
+    async def send_email_via_mcp(self, to: str, subject: str, body: str) -> dict:
+        """Send email using Email MCP Server."""
         try:
             # Call email_mcp_server.py directly
             cmd = [
@@ -377,40 +649,79 @@ Be specific and create actual files, not just suggestions."""
                 '--body', body
             ]
             
-            result = subprocess.run(
-                cmd,
-                cwd=str(Path(__file__).parent),
-                capture_output=True,
-                text=True,
-                timeout=60
+            returncode, _, stderr = await self._run_command(
+                cmd, timeout=60, cwd=self._scripts_dir
             )
             
-            if result.returncode == 0:
+            if returncode == 0:
                 return {'status': 'sent', 'id': 'sent_via_mcp'}
             else:
-                return {'status': 'error', 'error': result.stderr}
+                return {'status': 'error', 'error': stderr}
                 
         except Exception as e:
             return {'status': 'error', 'error': str(e)}
     
     def log_action(self, action_type: str, details: str, status: str = 'success'):
         """Log an action to the logs folder."""
-        today = datetime.now().strftime('%Y-%m-%d')
-        log_file = self.logs / f'{today}.jsonl'
+        now = datetime.now()
+        today = now.strftime('%Y-%m-%d')
+        if today != self._log_date:
+            self._close_log()
+            self._log_fp = open(self.logs / f'{today}.jsonl', 'a', buffering=8192, encoding='utf-8')
+            self._log_date = today
         
         log_entry = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'action_type': action_type,
             'actor': 'orchestrator',
             'details': details,
             'status': status
         }
         
-        import json
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        self._log_fp.write(json.dumps(log_entry, separators=(',', ':')) + '\n')
+        if status != 'success':
+            self._log_fp.flush()
+    
+    def _flush_log(self):
+        """Push buffered action log entries to disk."""
+        if self._log_fp is not None:
+            self._log_fp.flush()
+    
+    def _close_log(self):
+        """Close the open action log file, if any."""
+        if self._log_fp is not None:
+            self._log_fp.close()
+            self._log_fp = None
+            self._log_date = None
+    
+    def _schedule(self, name: str, process):
+        """
+        Start a folder processor in the background.
+        
+        Only one run per folder is active at a time; a change that arrives
+        while it is busy makes it go round once more when it finishes.
+        """
+        task = self._tasks.get(name)
+        if task is not None and not task.done():
+            self._rerun.add(name)
+            return
+        self._tasks[name] = asyncio.create_task(self._run_processor(name, process))
     
-    def run(self):
+    async def _run_processor(self, name: str, process):
+        """Run a processor until no further changes were queued for it."""
+        while True:
+            self._rerun.discard(name)
+            try:
+                await process()
+                self.update_dashboard()
+            except Exception as e:
+                self.logger.error(f'Error processing {name}: {e}')
+                self.log_action('error', str(e), 'failed')
+            self._flush_log()
+            if name not in self._rerun:
+                return
+    
+    async def run(self):
         """Main orchestration loop."""
         self.logger.info('=' * 50)
         self.logger.info('AI Employee Orchestrator starting')
@@ -418,24 +729,72 @@ Be specific and create actual files, not just suggestions."""
         self.logger.info(f'Check interval: {self.check_interval}s')
         self.logger.info('=' * 50)
         
-        while True:
-            try:
-                # Process pending items
-                self.process_needs_action()
+        # React to new files; check_interval is only a safety-net rescan
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        handler = FolderEventHandler(
+            lambda folder, delta: loop.call_soon_threadsafe(
+                self._on_folder_event, folder, delta, events),
+            list(self._count_folders)
+        )
+        if self._network_fs:
+            self.logger.info('Vault is on a network mount; polling for changes')
+            observer = PollingObserver(timeout=self.check_interval)
+        else:
+            observer = Observer()
+        for folder in self._count_folders:
+            observer.schedule(handler, str(folder), recursive=False)
+        observer.start()
+        
+        events.put_nowait(None)  # None = full sweep (startup and timeouts)
+        try:
+            while True:
+                try:
+                    changed = {await asyncio.wait_for(events.get(), self.check_interval)}
+                except asyncio.TimeoutError:
+                    changed = {None}
                 
-                # Process approved items
-                self.process_approved()
+                # Coalesce a burst of events into one pass
+                if None not in changed:
+                    await asyncio.sleep(DEBOUNCE_SECONDS)
+                while not events.empty():
+                    changed.add(events.get_nowait())
+                full_sweep = None in changed
                 
-                # Update dashboard
-                self.update_dashboard()
+                # Re-count folders that had events; re-scan all at startup
+                # and now and then in case the observer missed something
+                if full_sweep and (self._counts is None or
+                                   time.monotonic() - self._counts_synced > COUNT_RESYNC_SECONDS):
+                    self._counts = self._scan_counts()
+                    self._counts_synced = time.monotonic()
+                    self._stale_counts.clear()
+                else:
+                    self._refresh_counts()
                 
-            except Exception as e:
-                self.logger.error(f'Error in orchestration loop: {e}')
-                self.log_action('error', str(e), 'failed')
-            
-            # Wait for next check
-            import time
-            time.sleep(self.check_interval)
+                # Processors run in the background so long Qwen Code runs
+                # don't hold up new-file detection or dashboard refreshes
+                # Event-triggered runs bypass the folder mtime guard
+                if self.needs_action in changed:
+                    self._na_dir_mtime = 0
+                if self.approved in changed:
+                    self._ap_dir_mtime = 0
+                if full_sweep or self.needs_action in changed:
+                    self._schedule('needs_action', self.process_needs_action)
+                if full_sweep or self.approved in changed:
+                    self._schedule('approved', self.process_approved)
+                
+                try:
+                    # Update dashboard
+                    self.update_dashboard()
+                except Exception as e:
+                    self.logger.error(f'Error in orchestration loop: {e}')
+                    self.log_action('error', str(e), 'failed')
+                self._flush_log()
+        finally:
+            observer.stop()
+            observer.join()
+            self._counts = None
+            self._close_log()
 
 
 def main():
@@ -464,7 +823,10 @@ def main():
         sys.exit(1)
     
     orchestrator = Orchestrator(vault_path, interval)
-    orchestrator.run()
+    try:
+        asyncio.run(orchestrator.run())
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == '__main__':
@@ -6,16 +6,195 @@ Plan Creator - Automatically creates Plan.md and Approval files from action file
 This bypasses the need for Qwen Code to create files - it just analyzes and creates.
 """
 
+import os
 import sys
 import re
 import logging
+import tempfile
+from string import Template
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 
+# Optional: single-pass keyword matching (pip install pyahocorasick)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('plan_creator')
 
+# Frontmatter fields and the email body section
+_FRONTMATTER_FIELDS = frozenset(('from', 'to', 'subject', 'received', 'priority', 'message_id'))
+_BODY_RE = re.compile(r'# Email Content\s*\n([\s\S]*?)(?=^---|\n# |\Z)', re.MULTILINE)
+_ATTACHMENTS_RE = re.compile(r'^# Attachments\s*\n((?:- .*(?:\n|$))+)', re.MULTILINE)
+
+# Emails processed concurrently by main()
+MAX_WORKERS = 8
+
+# Keywords that make a reply need human approval
+SENSITIVE_KEYWORDS = ('payment', 'invoice', 'contract', 'legal', 'money', 'bank')
+if ahocorasick is not None:
+    _SENSITIVE_AC = ahocorasick.Automaton()
+    for _kw in SENSITIVE_KEYWORDS:
+        _SENSITIVE_AC.add_word(_kw, _kw)
+    _SENSITIVE_AC.make_automaton()
+else:
+    _SENSITIVE_AC = None
+
+
+_PLAN_TMPL = Template('''---
+created: $created
+status: in_progress
+objective: Process email and send reply
+related_to: EMAIL_$plan_id.md
+approval_required: $approval_required
+---
+
+# Plan: Process Email - $subject
+
+## Objective
+Process incoming email and send appropriate reply.
+
+## Email Details
+
+| Field | Value |
+|-------|-------|
+| From | $sender |
+| To | $to |
+| Subject | $subject |
+| Received | $received |
+| Priority | $priority |
+
+## Steps
+
+- [x] **Step 1: Read and analyze email**
+  - Email received and parsed
+  - Priority determined: $priority
+
+- [ ] **Step 2: Draft reply**
+  - Compose appropriate response
+  - Review for tone and accuracy
+
+- [ ] **Step 3: $step3_title**
+  $step3_detail
+
+- [ ] **Step 4: Log and archive**
+  - Log action in /Logs/
+  - Move email to /Done/
+
+## Notes
+
+Auto-generated plan by Plan Creator v0.1
+
+---
+*Generated automatically by AI Employee Plan Creator*
+''')
+
+_APPROVAL_TMPL = Template('''---
+type: approval_request
+action: email_send
+to: $to
+subject: Re: $subject
+created: $created
+expires: $expires
+status: pending
+priority: $priority
+---
+
+# Approval Required: Send Email Reply
+
+## Email Details
+
+| Field | Value |
+|-------|-------|
+| To | $sender |
+| Subject | Re: $subject |
+| Original Priority | $priority |
+
+## Suggested Reply
+
+$suggested_reply
+
+## Why Approval Required
+
+This email requires human approval before sending because:
+- Replying to external contact
+- Ensure response is appropriate and accurate
+
+---
+
+## To Approve
+
+Move this file to `/Approved` folder.
+
+## To Reject
+
+Move this file to `/Rejected` folder and add a comment.
+
+---
+*Generated automatically by AI Employee Plan Creator*
+''')
+
+# Suggested replies: (subject keywords, body keywords, reply), first match wins
+_GREETING_REPLY = '''Hi,
+
+Thank you for your message! I'm doing well, thank you.
+
+Hope you're doing great too.
+
+Best regards'''
+
+_INVOICE_REPLY = '''Dear Valued Client,
+
+Thank you for your inquiry regarding the invoice.
+
+I will process your request and send the invoice shortly.
+
+Best regards'''
+
+_URGENT_REPLY = '''Dear Sender,
+
+I received your urgent message and will respond as soon as possible.
+
+Thank you for your patience.
+
+Best regards'''
+
+_DEFAULT_REPLY = '''Dear Sender,
+
+Thank you for your email. I have received your message and will respond shortly.
+
+Best regards'''
+
+_REPLY_RULES = (
+    (('greeting',), ('how are you',), _GREETING_REPLY),
+    (('invoice', 'payment'), (), _INVOICE_REPLY),
+    (('urgent',), ('asap',), _URGENT_REPLY),
+)
+
+
+def _write_atomic(path: Path, text: str):
+    """Write text as UTF-8 to a unique temp file and rename it over path."""
+    view = memoryview(text.encode('utf-8'))
+    fd, tmp = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        try:
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.chmod(tmp, 0o644)  # mkstemp creates files owner-only
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
 
 class PlanCreator:
     """Automatically create plans and approval requests from action files."""
@@ -38,7 +217,7 @@ class PlanCreator:
         Returns:
             Dict with plan_path and approval_path (if created)
         """
-        content = email_file.read_text()
+        content = email_file.read_text(encoding='utf-8')
         
         # Extract email details
         email_data = self._parse_email_frontmatter(content)
@@ -47,6 +226,10 @@ class PlanCreator:
             logger.warning(f"Could not parse email: {email_file.name}")
             return None
         
+        # Files without a message_id are keyed by their own name (EMAIL_<id>.md)
+        if 'message_id' not in email_data:
+            email_data['message_id'] = email_file.stem.partition('EMAIL_')[2] or email_file.stem
+        
         # Determine if approval is needed
         needs_approval = self._check_approval_needed(email_data)
         
@@ -69,41 +252,36 @@ class PlanCreator:
         """Parse YAML frontmatter from email file."""
         data = {}
         
-        # Extract from
-        match = re.search(r'from:\s*(.+)', content)
-        if match:
-            data['from'] = match.group(1).strip()
-        
-        # Extract to
-        match = re.search(r'to:\s*(.+)', content)
-        if match:
-            data['to'] = match.group(1).strip()
-        
-        # Extract subject
-        match = re.search(r'subject:\s*(.+)', content)
-        if match:
-            data['subject'] = match.group(1).strip()
-        
-        # Extract received
-        match = re.search(r'received:\s*(.+)', content)
-        if match:
-            data['received'] = match.group(1).strip()
-        
-        # Extract priority
-        match = re.search(r'priority:\s*(.+)', content)
-        if match:
-            data['priority'] = match.group(1).strip()
-        
-        # Extract message_id
-        match = re.search(r'message_id:\s*(.+)', content)
-        if match:
-            data['message_id'] = match.group(1).strip()
+        # Extract from, to, subject, received, priority and message_id
+        # in one pass over the frontmatter block (whole file if there is none)
+        frontmatter = rest = content
+        if content.startswith('---'):
+            parts = content.split('---\n', 2)
+            if len(parts) == 3:
+                frontmatter, rest = parts[1], parts[2]
+        
+        for line in frontmatter.splitlines():
+            key, sep, value = line.partition(':')
+            key = key.strip()
+            if sep and key in _FRONTMATTER_FIELDS and key not in data:
+                value = value.strip()
+                if value:
+                    data[key] = value
+        
+        # Bare sender address for replies ("Name <addr>" -> "addr")
+        if 'from' in data:
+            data['from_addr'] = data['from'].split('<')[-1].strip('>').strip()
         
         # Extract email body (after frontmatter)
-        body_match = re.search(r'# Email Content\s*\n(.*?)(?:^---|\n# |\Z)', content, re.DOTALL | re.MULTILINE)
+        body_match = _BODY_RE.search(rest)
         if body_match:
             data['body'] = body_match.group(1).strip()
         
+        # Listed attachments (the section reads *No attachments* otherwise)
+        attachments_match = _ATTACHMENTS_RE.search(rest)
+        if attachments_match:
+            data['attachments'] = attachments_match.group(1).strip()
+        
         return data if data else None
     
     def _check_approval_needed(self, email_data: Dict[str, str]) -> bool:
@@ -119,15 +297,16 @@ class PlanCreator:
             return True
         
         # If email contains attachments, require approval
-        if 'attachments' in str(email_data):
+        if 'attachments' in email_data:
             return True
         
         # If high priority or contains sensitive keywords
-        subject = email_data.get('subject', '').lower()
-        body = email_data.get('body', '').lower()
+        text = f"{email_data.get('subject', '')}\n{email_data.get('body', '')}".lower()
         
-        sensitive_keywords = ['payment', 'invoice', 'contract', 'legal', 'money', 'bank']
-        if any(kw in subject or kw in body for kw in sensitive_keywords):
+        if _SENSITIVE_AC is not None:
+            if next(_SENSITIVE_AC.iter(text), None) is not None:
+                return True
+        elif any(kw in text for kw in SENSITIVE_KEYWORDS):
             return True
         
         return False
@@ -135,59 +314,25 @@ class PlanCreator:
     def _create_plan(self, email_data: Dict[str, str], needs_approval: bool) -> Path:
         """Create Plan.md file."""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        plan_id = email_data.get('message_id', timestamp)[:8]
+        plan_id = email_data.get('message_id', timestamp)
         filename = f'PLAN_email_{plan_id}.md'
         
-        plan_content = f'''---
-created: {datetime.now().isoformat()}
-status: in_progress
-objective: Process email and send reply
-related_to: EMAIL_{plan_id}.md
-approval_required: {str(needs_approval).lower()}
----
-
-# Plan: Process Email - {email_data.get('subject', 'No Subject')}
-
-## Objective
-Process incoming email and send appropriate reply.
-
-## Email Details
-
-| Field | Value |
-|-------|-------|
-| From | {email_data.get('from', 'Unknown')} |
-| To | {email_data.get('to', 'N/A')} |
-| Subject | {email_data.get('subject', 'No Subject')} |
-| Received | {email_data.get('received', 'Unknown')} |
-| Priority | {email_data.get('priority', 'normal')} |
-
-## Steps
-
-- [x] **Step 1: Read and analyze email**
-  - Email received and parsed
-  - Priority determined: {email_data.get('priority', 'normal')}
-
-- [ ] **Step 2: Draft reply**
-  - Compose appropriate response
-  - Review for tone and accuracy
-
-- [ ] **Step 3: {"Request approval" if needs_approval else "Send email"}**
-  {"- Approval request created in /Pending_Approval/" if needs_approval else "- Send reply via Email MCP"}
-
-- [ ] **Step 4: Log and archive**
-  - Log action in /Logs/
-  - Move email to /Done/
-
-## Notes
-
-Auto-generated plan by Plan Creator v0.1
-
----
-*Generated automatically by AI Employee Plan Creator*
-'''
+        plan_content = _PLAN_TMPL.substitute(
+            created=datetime.now().isoformat(),
+            plan_id=plan_id,
+            approval_required=str(needs_approval).lower(),
+            subject=email_data.get('subject', 'No Subject'),
+            sender=email_data.get('from', 'Unknown'),
+            to=email_data.get('to', 'N/A'),
+            received=email_data.get('received', 'Unknown'),
+            priority=email_data.get('priority', 'normal'),
+            step3_title="Request approval" if needs_approval else "Send email",
+            step3_detail=("- Approval request created in /Pending_Approval/" if needs_approval
+                          else "- Send reply via Email MCP"),
+        )
         
         plan_path = self.plans / filename
-        plan_path.write_text(plan_content)
+        _write_atomic(plan_path, plan_content)
         logger.info(f"Created plan: {filename}")
         
         return plan_path
@@ -195,59 +340,25 @@ Auto-generated plan by Plan Creator v0.1
     def _create_approval_request(self, email_data: Dict[str, str]) -> Path:
         """Create approval request file."""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        plan_id = email_data.get('message_id', timestamp)[:8]
+        plan_id = email_data.get('message_id', timestamp)
         filename = f'APPROVAL_email_reply_{plan_id}.md'
         
         # Generate suggested reply
         suggested_reply = self._generate_suggested_reply(email_data)
         
-        approval_content = f'''---
-type: approval_request
-action: email_send
-to: {email_data.get('from', '').split('<')[-1].strip('>').strip()}
-subject: Re: {email_data.get('subject', 'No Subject')}
-created: {datetime.now().isoformat()}
-expires: {(datetime.now().replace(hour=23, minute=59)).isoformat()}
-status: pending
-priority: {email_data.get('priority', 'normal')}
----
-
-# Approval Required: Send Email Reply
-
-## Email Details
-
-| Field | Value |
-|-------|-------|
-| To | {email_data.get('from', 'Unknown')} |
-| Subject | Re: {email_data.get('subject', 'No Subject')} |
-| Original Priority | {email_data.get('priority', 'normal')} |
-
-## Suggested Reply
-
-{suggested_reply}
-
-## Why Approval Required
-
-This email requires human approval before sending because:
-- Replying to external contact
-- Ensure response is appropriate and accurate
-
----
-
-## To Approve
-
-Move this file to `/Approved` folder.
-
-## To Reject
-
-Move this file to `/Rejected` folder and add a comment.
-
----
-*Generated automatically by AI Employee Plan Creator*
-'''
+        now = datetime.now()
+        approval_content = _APPROVAL_TMPL.substitute(
+            to=email_data.get('from_addr', ''),
+            subject=email_data.get('subject', 'No Subject'),
+            created=now.isoformat(),
+            expires=now.replace(hour=23, minute=59).isoformat(),
+            priority=email_data.get('priority', 'normal'),
+            sender=email_data.get('from', 'Unknown'),
+            suggested_reply=suggested_reply,
+        )
         
         approval_path = self.pending_approval / filename
-        approval_path.write_text(approval_content)
+        _write_atomic(approval_path, approval_content)
         logger.info(f"Created approval request: {filename}")
         
         return approval_path
@@ -255,42 +366,14 @@ Move this file to `/Rejected` folder and add a comment.
     def _generate_suggested_reply(self, email_data: Dict[str, str]) -> str:
         """Generate a suggested reply based on email content."""
         subject = email_data.get('subject', '').lower()
-        body = email_data.get('body', '')
-        
-        # Check for common patterns
-        if 'greeting' in subject or 'how are you' in body.lower():
-            return f'''Hi,
-
-Thank you for your message! I'm doing well, thank you.
-
-Hope you're doing great too.
-
-Best regards'''
+        body = email_data.get('body', '').lower()
         
-        elif 'invoice' in subject or 'payment' in subject:
-            return f'''Dear Valued Client,
-
-Thank you for your inquiry regarding the invoice.
-
-I will process your request and send the invoice shortly.
-
-Best regards'''
+        # First rule whose subject or body keywords match wins
+        for subject_keys, body_keys, reply in _REPLY_RULES:
+            if any(k in subject for k in subject_keys) or any(k in body for k in body_keys):
+                return reply
         
-        elif 'urgent' in subject or 'asap' in body.lower():
-            return f'''Dear Sender,
-
-I received your urgent message and will respond as soon as possible.
-
-Thank you for your patience.
-
-Best regards'''
-        
-        else:
-            return f'''Dear Sender,
-
-Thank you for your email. I have received your message and will respond shortly.
-
-Best regards'''
+        return _DEFAULT_REPLY
 
 
 def main():
@@ -315,11 +398,23 @@ def main():
     
     print(f"Found {len(email_files)} email(s) to process")
     
-    for email_file in email_files:
-        print(f"\nProcessing: {email_file.name}")
-        result = creator.process_email(email_file)
+    def process(email_file):
+        try:
+            return creator.process_email(email_file), None
+        except Exception as e:
+            logger.error(f"Error processing {email_file.name}: {e}")
+            return None, e
+    
+    # Each email writes its own message_id-keyed files, so run them concurrently
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(email_files))) as executor:
+        results = list(executor.map(process, email_files))
+    
+    for email_file, (result, error) in zip(email_files, results):
+        print(f"\nProcessed: {email_file.name}")
         
-        if result:
+        if error is not None:
+            print(f"  Error: {error}")
+        elif result:
             print(f"  Plan created: {result['plan_path']}")
             if result['approval_path']:
                 print(f"  Approval created: {result['approval_path']}")
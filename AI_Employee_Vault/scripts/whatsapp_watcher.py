@@ -225,7 +225,7 @@ keywords_matched: {', '.join(message['keywords'])}
 **Note:** Verify message in WhatsApp before responding. Session: {self.session_path.name}
 '''
         filepath = self.needs_action / filename
-        filepath.write_text(content)
+        filepath.write_bytes(content.encode('utf-8'))
         
         self.logger.info(f"Created action file: {filename}")
         return filepath